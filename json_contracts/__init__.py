@@ -2,47 +2,39 @@
 
 from __future__ import annotations
 
+import importlib
 import sys as _sys
+from typing import TYPE_CHECKING, Protocol, cast
 
-_JSON_VALUE_TYPES: list[str] = [
-    "object",
-    "array",
-    "string",
-    "number",
-    "boolean",
-    "null",
-]
-
-_STRING_LIST_SCHEMA: dict[str, object] = {
-    "type": "array",
-    "items": {"type": "string", "minLength": 1},
-}
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
 
-_PACKAGES_SCHEMA: dict[str, object] = {
-    "type": "array",
-    "items": {"type": "string", "minLength": 1},
+# Shared leaf schemas live once under ``$defs`` and are referenced everywhere
+# else, so validators compile each of them a single time.
+_DEFS: dict[str, object] = {
+    "nonEmptyString": {"type": "string", "minLength": 1},
+    # ``minLength`` only applies to strings, so null passes the union as-is.
+    "nullableString": {"type": ["string", "null"], "minLength": 1},
+    "stringList": {
+        "type": "array",
+        "items": {"$ref": "#/$defs/nonEmptyString"},
+    },
 }
 
-_PUBLISHED_VERSION_VALUE: dict[str, object] = {
-    "oneOf": [
-        {"type": "string", "minLength": 1},
-        {"type": "null"},
-    ]
-}
+_NON_EMPTY_STRING: dict[str, object] = {"$ref": "#/$defs/nonEmptyString"}
+_NULLABLE_STRING: dict[str, object] = {"$ref": "#/$defs/nullableString"}
+_STRING_LIST_SCHEMA: dict[str, object] = {"$ref": "#/$defs/stringList"}
 
 _PUBLISHED_VERSIONS_SCHEMA: dict[str, object] = {
     "type": "object",
-    "additionalProperties": _PUBLISHED_VERSION_VALUE,
+    "additionalProperties": _NULLABLE_STRING,
 }
 
 _PUBLISHED_ARTIFACT_ENTRY_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "main": {"type": "string", "minLength": 1},
-        "anc": {
-            "type": "array",
-            "items": {"type": "string", "minLength": 1},
-        },
+        "main": _NON_EMPTY_STRING,
+        "anc": _STRING_LIST_SCHEMA,
     },
     "required": ["main"],
     "additionalProperties": True,
@@ -74,7 +66,7 @@ _CONTEXT_SCHEMA: dict[str, object] = {
 _CLONER_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "target_dir": {"type": "string", "minLength": 1},
+        "target_dir": _NON_EMPTY_STRING,
     },
     "additionalProperties": True,
 }
@@ -82,12 +74,13 @@ _CLONER_SCHEMA: dict[str, object] = {
 _PARAMETERS_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "packages": _PACKAGES_SCHEMA,
-        "repo_parent_root": {"type": "string", "minLength": 1},
+        "packages": _STRING_LIST_SCHEMA,
+        "repo_parent_root": _NON_EMPTY_STRING,
         "published_versions": _PUBLISHED_VERSIONS_SCHEMA,
         "published_artifacts": _PUBLISHED_ARTIFACTS_SCHEMA,
         "context": _CONTEXT_SCHEMA,
         "cloner": _CLONER_SCHEMA,
+        "verify": {"type": "boolean"},
     },
     "required": [
         "packages",
@@ -101,6 +94,7 @@ _PARAMETERS_SCHEMA: dict[str, object] = {
 INPUT_SCHEMA: dict[str, object] = {
     "$schema": "https://json-schema.org/draft/2020-12/schema",
     "title": "x_make_pip_updates_x input",
+    "$defs": _DEFS,
     "type": "object",
     "properties": {
         "command": {"const": "x_make_pip_updates_x"},
@@ -126,6 +120,7 @@ _FALLBACK_DETAIL_SCHEMA: dict[str, object] = {
         "invoked": {"type": "boolean"},
         "pinned": _STRING_LIST_SCHEMA,
         "loose": _STRING_LIST_SCHEMA,
+        "failed": _STRING_LIST_SCHEMA,
     },
     "required": ["invoked", "pinned", "loose"],
     "additionalProperties": False,
@@ -138,7 +133,7 @@ _RETRY_DETAIL_SCHEMA: dict[str, object] = {
         "return_code": {"type": ["integer", "null"]},
         "packages": {
             "type": "array",
-            "items": {"type": "string", "minLength": 1},
+            "items": _NON_EMPTY_STRING,
             "minItems": 1,
         },
     },
@@ -149,7 +144,7 @@ _RETRY_DETAIL_SCHEMA: dict[str, object] = {
 _EXECUTION_DETAIL_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "script_path": {"type": "string", "minLength": 1},
+        "script_path": _NON_EMPTY_STRING,
         "script_available": {"type": "boolean"},
         "script_attempt": _SCRIPT_ATTEMPT_SCHEMA,
         "fallback": _FALLBACK_DETAIL_SCHEMA,
@@ -162,14 +157,9 @@ _EXECUTION_DETAIL_SCHEMA: dict[str, object] = {
 _MISMATCH_ENTRY_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "package": {"type": "string", "minLength": 1},
-        "expected": {"type": "string", "minLength": 1},
-        "observed": {
-            "oneOf": [
-                {"type": "string", "minLength": 1},
-                {"type": "null"},
-            ]
-        },
+        "package": _NON_EMPTY_STRING,
+        "expected": _NON_EMPTY_STRING,
+        "observed": _NULLABLE_STRING,
     },
     "required": ["package", "expected", "observed"],
     "additionalProperties": False,
@@ -177,12 +167,7 @@ _MISMATCH_ENTRY_SCHEMA: dict[str, object] = {
 
 _VERSION_MAPPING_SCHEMA: dict[str, object] = {
     "type": "object",
-    "additionalProperties": {
-        "oneOf": [
-            {"type": "string", "minLength": 1},
-            {"type": "null"},
-        ]
-    },
+    "additionalProperties": _NULLABLE_STRING,
 }
 
 _VERIFICATION_SCHEMA: dict[str, object] = {
@@ -192,18 +177,8 @@ _VERIFICATION_SCHEMA: dict[str, object] = {
             "type": "string",
             "enum": ["performed", "skipped"],
         },
-        "detail": {
-            "oneOf": [
-                {"type": "string", "minLength": 1},
-                {"type": "null"},
-            ]
-        },
-        "reason": {
-            "oneOf": [
-                {"type": "string", "minLength": 1},
-                {"type": "null"},
-            ]
-        },
+        "detail": _NULLABLE_STRING,
+        "reason": _NULLABLE_STRING,
         "missing": _STRING_LIST_SCHEMA,
     },
     "required": ["status"],
@@ -246,17 +221,21 @@ _RESULT_SKIPPED_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
         "status": {"const": "skipped"},
-        "reason": {"type": "string", "minLength": 1},
+        "reason": _NON_EMPTY_STRING,
     },
     "required": ["status", "reason"],
     "additionalProperties": True,
 }
 
+# Dispatch on ``status`` instead of ``oneOf`` so only one branch is evaluated.
 _RESULT_DETAIL_SCHEMA: dict[str, object] = {
-    "oneOf": [
-        _RESULT_COMPLETED_SCHEMA,
-        _RESULT_SKIPPED_SCHEMA,
-    ]
+    "if": {
+        "type": "object",
+        "properties": {"status": {"const": "skipped"}},
+        "required": ["status"],
+    },
+    "then": _RESULT_SKIPPED_SCHEMA,
+    "else": _RESULT_COMPLETED_SCHEMA,
 }
 
 _INPUTS_DETAIL_SCHEMA: dict[str, object] = {
@@ -265,7 +244,8 @@ _INPUTS_DETAIL_SCHEMA: dict[str, object] = {
         "requested_packages": _STRING_LIST_SCHEMA,
         "normalized_packages": _STRING_LIST_SCHEMA,
         "use_user_flag": {"type": "boolean"},
-        "repo_parent_root": {"type": "string", "minLength": 1},
+        "verify": {"type": "boolean"},
+        "repo_parent_root": _NON_EMPTY_STRING,
         "published_versions": _PUBLISHED_VERSIONS_SCHEMA,
         "published_artifacts": _PUBLISHED_ARTIFACTS_SCHEMA,
     },
@@ -283,8 +263,8 @@ _INPUTS_DETAIL_SCHEMA: dict[str, object] = {
 _ERROR_ENTRY_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
-        "type": {"type": "string", "minLength": 1},
-        "message": {"type": "string", "minLength": 1},
+        "type": _NON_EMPTY_STRING,
+        "message": _NON_EMPTY_STRING,
     },
     "required": ["type", "message"],
     "additionalProperties": True,
@@ -293,11 +273,16 @@ _ERROR_ENTRY_SCHEMA: dict[str, object] = {
 OUTPUT_SCHEMA: dict[str, object] = {
     "$schema": "https://json-schema.org/draft/2020-12/schema",
     "title": "x_make_pip_updates_x output",
+    "$defs": _DEFS,
     "type": "object",
     "properties": {
         "run_id": {
             "type": "string",
+            # Python's ``$`` also matches before a trailing newline; the exact
+            # length keeps every validator backend rejecting one.
             "pattern": "^[a-f0-9]{32}$",
+            "minLength": 32,
+            "maxLength": 32,
         },
         "started_at": {"type": "string", "format": "date-time"},
         "inputs": _INPUTS_DETAIL_SCHEMA,
@@ -331,20 +316,136 @@ OUTPUT_SCHEMA: dict[str, object] = {
 ERROR_SCHEMA: dict[str, object] = {
     "$schema": "https://json-schema.org/draft/2020-12/schema",
     "title": "x_make_pip_updates_x error",
+    "$defs": _DEFS,
     "type": "object",
     "properties": {
         "status": {"const": "failure"},
-        "message": {"type": "string", "minLength": 1},
+        "message": _NON_EMPTY_STRING,
         "details": {
             "type": "object",
-            "additionalProperties": {"type": _JSON_VALUE_TYPES},
+            "additionalProperties": True,
         },
     },
     "required": ["status", "message"],
     "additionalProperties": True,
 }
 
+
+class _Validator(Protocol):
+    def validate(self, instance: object) -> None: ...
+
+    def is_valid(self, instance: object) -> bool: ...
+
+    def iter_errors(self, instance: object) -> Iterator[Exception]: ...
+
+
+class _ValidatorClass(Protocol):
+    def __call__(self, schema: Mapping[str, object]) -> _Validator: ...
+
+    def check_schema(self, schema: Mapping[str, object]) -> None: ...
+
+
+class _ValidatorsModule(Protocol):
+    def validator_for(self, schema: Mapping[str, object]) -> _ValidatorClass: ...
+
+
+def _build_validator(schema: Mapping[str, object]) -> _Validator:
+    module = cast("_ValidatorsModule", importlib.import_module("jsonschema.validators"))
+    validator_cls = module.validator_for(schema)
+    # Fail at import on a malformed contract rather than on the first payload.
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+class _FastjsonschemaModule(Protocol):
+    JsonSchemaException: type[Exception]
+
+    def compile(
+        self, definition: Mapping[str, object], *, use_formats: bool
+    ) -> Callable[[object], object]: ...
+
+
+_JSON_SCALAR_TYPES: frozenset[type] = frozenset({str, int, float, bool, type(None)})
+
+
+def _is_plain_json(instance: object) -> bool:
+    """Return whether ``instance`` only holds the types ``json.loads`` builds."""
+    kind = type(instance)
+    if kind is dict:
+        mapping = cast("dict[object, object]", instance)
+        return all(
+            type(key) is str and _is_plain_json(value) for key, value in mapping.items()
+        )
+    if kind is list:
+        return all(_is_plain_json(item) for item in cast("list[object]", instance))
+    return kind in _JSON_SCALAR_TYPES
+
+
+def _build_fast_check(
+    schema: Mapping[str, object], validator: _Validator
+) -> Callable[[object], bool]:
+    """Return a boolean validity check that runs a single backend per payload.
+
+    ``fastjsonschema`` is optional; without it the cached jsonschema validator
+    answers alone. The generated code only agrees with jsonschema on plain
+    JSON: it treats tuples as arrays and any Mapping as an object. Payloads
+    built from anything else go to jsonschema instead. Formats stay unchecked
+    to match the detailed validators.
+    """
+    try:
+        module = cast(
+            "_FastjsonschemaModule", importlib.import_module("fastjsonschema")
+        )
+    except ImportError:
+        return validator.is_valid
+    exception_type = module.JsonSchemaException
+    try:
+        compiled = module.compile(schema, use_formats=False)
+    except exception_type:
+        return validator.is_valid
+
+    def _check(instance: object) -> bool:
+        if not _is_plain_json(instance):
+            return validator.is_valid(instance)
+        try:
+            compiled(instance)
+        except exception_type:
+            return False
+        return True
+
+    return _check
+
+
+# Validators are compiled once at import so each payload check only pays for
+# walking the payload, not for re-resolving the schema tree.
+_INPUT_VALIDATOR = _build_validator(INPUT_SCHEMA)
+_OUTPUT_VALIDATOR = _build_validator(OUTPUT_SCHEMA)
+_ERROR_VALIDATOR = _build_validator(ERROR_SCHEMA)
+
+validate_input = _INPUT_VALIDATOR.validate
+validate_output = _OUTPUT_VALIDATOR.validate
+validate_error = _ERROR_VALIDATOR.validate
+
+iter_input_errors = _INPUT_VALIDATOR.iter_errors
+iter_output_errors = _OUTPUT_VALIDATOR.iter_errors
+
+is_valid_input = _build_fast_check(INPUT_SCHEMA, _INPUT_VALIDATOR)
+is_valid_output = _build_fast_check(OUTPUT_SCHEMA, _OUTPUT_VALIDATOR)
+is_valid_error = _build_fast_check(ERROR_SCHEMA, _ERROR_VALIDATOR)
+
 # Preserve legacy import path "json_contracts" for downstream tooling.
 _sys.modules.setdefault("json_contracts", _sys.modules[__name__])
 
-__all__ = ["ERROR_SCHEMA", "INPUT_SCHEMA", "OUTPUT_SCHEMA"]
+__all__ = [
+    "ERROR_SCHEMA",
+    "INPUT_SCHEMA",
+    "OUTPUT_SCHEMA",
+    "is_valid_error",
+    "is_valid_input",
+    "is_valid_output",
+    "iter_input_errors",
+    "iter_output_errors",
+    "validate_error",
+    "validate_input",
+    "validate_output",
+]
@@ -0,0 +1,51 @@
+"""Session-wide fixtures shared by the x_make_pip_updates_x test modules."""
+
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import cast
+
+import pytest
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "json_contracts"
+
+
+@pytest.fixture(scope="session")
+def json_contract_fixtures() -> dict[str, dict[str, object]]:
+    """Parse every JSON contract fixture once per test session.
+
+    Tests receive deep copies through the ``sample_*`` fixtures, so this cache
+    must not be handed out or mutated directly.
+    """
+    fixtures: dict[str, dict[str, object]] = {}
+    for path in sorted(FIXTURE_DIR.glob("*.json")):
+        loaded: object = json.loads(path.read_bytes())
+        if not isinstance(loaded, dict):
+            message = f"Fixture payload must be an object: {path.stem}"
+            raise TypeError(message)
+        payload = cast("dict[str, object]", loaded)
+        fixtures[path.stem] = {str(key): value for key, value in payload.items()}
+    return fixtures
+
+
+@pytest.fixture
+def sample_input(
+    json_contract_fixtures: dict[str, dict[str, object]],
+) -> dict[str, object]:
+    return copy.deepcopy(json_contract_fixtures["input"])
+
+
+@pytest.fixture
+def sample_output(
+    json_contract_fixtures: dict[str, dict[str, object]],
+) -> dict[str, object]:
+    return copy.deepcopy(json_contract_fixtures["output"])
+
+
+@pytest.fixture
+def sample_error(
+    json_contract_fixtures: dict[str, dict[str, object]],
+) -> dict[str, object]:
+    return copy.deepcopy(json_contract_fixtures["error"])
@@ -1,37 +1,32 @@
 from __future__ import annotations
 
-# ruff: noqa: S101 - assertions express expectations in test cases
+# ruff: noqa: S101, SLF001 - assertions and private member access are OK in tests
 import copy
 import json
 from pathlib import Path
-from typing import cast
+from typing import TYPE_CHECKING, cast
+
+import pytest
 
 from x_make_common_x.json_contracts import validate_payload, validate_schema
+from x_make_pip_updates_x import json_contracts
 from x_make_pip_updates_x.json_contracts import (
     ERROR_SCHEMA,
     INPUT_SCHEMA,
     OUTPUT_SCHEMA,
+    is_valid_error,
+    is_valid_input,
+    is_valid_output,
+    validate_error,
+    validate_input,
+    validate_output,
 )
 from x_make_pip_updates_x.update_flow import main_json
 
-FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "json_contracts"
-REPORTS_DIR = Path(__file__).resolve().parents[1] / "reports"
-
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
-def _load_fixture(name: str) -> dict[str, object]:
-    path = FIXTURE_DIR / f"{name}.json"
-    with path.open("r", encoding="utf-8") as handle:
-        loaded: object = json.load(handle)
-    if not isinstance(loaded, dict):
-        message = f"Fixture payload must be an object: {name}"
-        raise TypeError(message)
-    payload = cast("dict[str, object]", loaded)
-    return {str(key): value for key, value in payload.items()}
-
-
-SAMPLE_INPUT = _load_fixture("input")
-SAMPLE_OUTPUT = _load_fixture("output")
-SAMPLE_ERROR = _load_fixture("error")
+REPORTS_DIR = Path(__file__).resolve().parents[1] / "reports"
 
 
 def test_schemas_are_valid() -> None:
@@ -39,18 +34,99 @@ def test_schemas_are_valid() -> None:
         validate_schema(schema)
 
 
-def test_sample_payloads_match_schema() -> None:
-    validate_payload(SAMPLE_INPUT, INPUT_SCHEMA)
-    validate_payload(SAMPLE_OUTPUT, OUTPUT_SCHEMA)
-    validate_payload(SAMPLE_ERROR, ERROR_SCHEMA)
+def test_sample_payloads_match_schema(
+    sample_input: dict[str, object],
+    sample_output: dict[str, object],
+    sample_error: dict[str, object],
+) -> None:
+    validate_payload(sample_input, INPUT_SCHEMA)
+    validate_payload(sample_output, OUTPUT_SCHEMA)
+    validate_payload(sample_error, ERROR_SCHEMA)
+
+
+def test_cached_validators_accept_sample_payloads(
+    sample_input: dict[str, object],
+    sample_output: dict[str, object],
+    sample_error: dict[str, object],
+) -> None:
+    validate_input(sample_input)
+    validate_output(sample_output)
+    validate_error(sample_error)
+
+
+def test_fast_checks_accept_samples_and_reject_invalid_payloads(
+    sample_input: dict[str, object],
+    sample_output: dict[str, object],
+    sample_error: dict[str, object],
+) -> None:
+    assert is_valid_input(sample_input)
+    assert is_valid_output(sample_output)
+    assert is_valid_error(sample_error)
+    assert not is_valid_input({"command": "x_make_pip_updates_x"})
+    assert not is_valid_error({"status": "success"})
+
+
+def test_fast_checks_agree_with_jsonschema(
+    sample_input: dict[str, object],
+    sample_output: dict[str, object],
+) -> None:
+    pytest.importorskip("fastjsonschema")
+    jsonschema = pytest.importorskip("jsonschema")
+    tuple_packages = copy.deepcopy(sample_input)
+    parameters = cast("dict[str, object]", tuple_packages["parameters"])
+    parameters["packages"] = tuple(cast("list[str]", parameters["packages"]))
+    newline_run_id = copy.deepcopy(sample_output)
+    newline_run_id["run_id"] = f"{newline_run_id['run_id']}\n"
+    cases = [
+        (is_valid_input, INPUT_SCHEMA, sample_input),
+        (is_valid_input, INPUT_SCHEMA, tuple_packages),
+        (is_valid_output, OUTPUT_SCHEMA, sample_output),
+        (is_valid_output, OUTPUT_SCHEMA, newline_run_id),
+    ]
+
+    # fastjsonschema alone would accept the tuple as an array, so non-plain
+    # payloads must be answered by jsonschema instead.
+    for fast_check, schema, payload in cases:
+        reference = jsonschema.Draft202012Validator(schema).is_valid(payload)
+        assert fast_check(payload) is reference
+    assert not is_valid_input(tuple_packages)
+    assert not is_valid_output(newline_run_id)
+
+
+def test_fast_check_skips_jsonschema_for_plain_json(
+    sample_input: dict[str, object],
+) -> None:
+    pytest.importorskip("fastjsonschema")
+    calls: list[object] = []
+
+    class _SpyValidator:
+        def validate(self, instance: object) -> None:
+            del instance
+
+        def is_valid(self, instance: object) -> bool:
+            calls.append(instance)
+            return False
+
+        def iter_errors(self, instance: object) -> Iterator[Exception]:
+            del instance
+            return iter(())
+
+    check = json_contracts._build_fast_check(INPUT_SCHEMA, _SpyValidator())
+    tuple_packages = copy.deepcopy(sample_input)
+    parameters = cast("dict[str, object]", tuple_packages["parameters"])
+    parameters["packages"] = tuple(cast("list[str]", parameters["packages"]))
+
+    assert check(sample_input)
+    assert not calls
+    assert not check(tuple_packages)
+    assert calls == [tuple_packages]
 
 
 def test_existing_reports_align_with_schema() -> None:
     report_files = sorted(REPORTS_DIR.glob("x_make_pip_updates_x_run_*.json"))
     assert report_files, "expected at least one pip-updates run report to validate"
     for report_file in report_files:
-        with report_file.open("r", encoding="utf-8") as handle:
-            loaded: object = json.load(handle)
+        loaded: object = json.loads(report_file.read_bytes())
         if not isinstance(loaded, dict):
             message = f"Report payload must be an object: {report_file}"
             raise TypeError(message)
@@ -58,18 +134,18 @@ def test_existing_reports_align_with_schema() -> None:
         validate_payload(typed_payload, OUTPUT_SCHEMA)
 
 
-def test_main_json_executes_happy_path() -> None:
-    payload = copy.deepcopy(SAMPLE_INPUT)
-    result = main_json(payload)
+def test_main_json_executes_happy_path(sample_input: dict[str, object]) -> None:
+    result = main_json(sample_input)
     validate_payload(result, OUTPUT_SCHEMA)
     assert result["status"] in {"success", "error"}
 
 
-def test_main_json_returns_error_for_invalid_payload() -> None:
-    invalid = copy.deepcopy(SAMPLE_INPUT)
-    parameters = invalid.get("parameters")
+def test_main_json_returns_error_for_invalid_payload(
+    sample_input: dict[str, object],
+) -> None:
+    parameters = sample_input.get("parameters")
     if isinstance(parameters, dict):
         parameters.pop("repo_parent_root", None)
-    result = main_json(invalid)
+    result = main_json(sample_input)
     validate_payload(result, ERROR_SCHEMA)
     assert result["status"] == "failure"
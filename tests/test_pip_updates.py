@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 
+import io
 import json
 import subprocess
 import typing
@@ -75,6 +76,10 @@ def test_get_installed_version_handles_missing_package(
     assert PipUpdatesRunner.get_installed_version("missing") is None
 
 
+def _no_pypi_answer(_dist_name: str) -> str | None:
+    return None
+
+
 def test_is_outdated_returns_true_when_package_listed(
     monkeypatch: MonkeyPatch,
 ) -> None:
@@ -90,6 +95,7 @@ def test_is_outdated_returns_true_when_package_listed(
     def fake_run(_cmd: list[str]) -> tuple[int, str, str]:
         return 0, payload, ""
 
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", _no_pypi_answer)
     monkeypatch.setattr(PipUpdatesRunner, "_run", staticmethod(fake_run))
 
     assert PipUpdatesRunner().is_outdated("somepkg") is True
@@ -101,9 +107,117 @@ def test_is_outdated_handles_non_json_response(
     def fake_run(_cmd: list[str]) -> tuple[int, str, str]:
         return 0, "not json", ""
 
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", _no_pypi_answer)
+    monkeypatch.setattr(PipUpdatesRunner, "_run", staticmethod(fake_run))
+
+    assert PipUpdatesRunner().is_outdated("pkg") is False
+
+
+def test_is_outdated_reuses_single_pip_list_probe(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    probes: list[list[str]] = []
+    payload = json.dumps([{"name": "Foo", "version": "1.0"}])
+
+    def fake_run(cmd: list[str]) -> tuple[int, str, str]:
+        probes.append(list(cmd))
+        return 0, payload, ""
+
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", _no_pypi_answer)
+    monkeypatch.setattr(PipUpdatesRunner, "_run", staticmethod(fake_run))
+    runner = PipUpdatesRunner()
+
+    assert runner.is_outdated("foo") is True
+    assert runner.is_outdated("bar") is False
+    assert len([cmd for cmd in probes if "--outdated" in cmd]) == 1
+
+
+def test_is_outdated_trusts_pypi_only_when_nothing_is_newer(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    probes: list[list[str]] = []
+
+    def fake_run(cmd: list[str]) -> tuple[int, str, str]:
+        if "config" in cmd:
+            return 0, "global.timeout='60'\n", ""
+        probes.append(list(cmd))
+        return 0, "[]", ""
+
+    for var in pip_module._INDEX_OVERRIDE_ENV:
+        monkeypatch.delenv(var, raising=False)
     monkeypatch.setattr(PipUpdatesRunner, "_run", staticmethod(fake_run))
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", lambda _name: "1.9")
+    monkeypatch.setattr(
+        PipUpdatesRunner, "get_installed_version", staticmethod(lambda _name: "1.10")
+    )
 
     assert PipUpdatesRunner().is_outdated("pkg") is False
+    assert not probes
+
+    # A newer PyPI release may not install here, so pip list has the last word.
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", lambda _name: "2.0")
+    assert PipUpdatesRunner().is_outdated("pkg") is False
+    assert len(probes) == 1
+
+
+def test_is_outdated_uses_pip_list_when_pypi_cannot_answer(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    payload = json.dumps([{"name": "pkg", "version": "1.0"}])
+
+    def fake_run(cmd: list[str]) -> tuple[int, str, str]:
+        if "config" in cmd:
+            return 0, "global.index-url='https://mirror.example/simple'\n", ""
+        return 0, payload, ""
+
+    def fail_pypi(_name: str) -> str | None:
+        message = "PyPI must not be asked when another index is configured"
+        raise AssertionError(message)
+
+    for var in pip_module._INDEX_OVERRIDE_ENV:
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(PipUpdatesRunner, "_run", staticmethod(fake_run))
+    monkeypatch.setattr(pip_module, "_latest_pypi_version", fail_pypi)
+
+    assert PipUpdatesRunner().is_outdated("pkg") is True
+
+    # Without packaging the PyPI answer cannot be ordered, so pip list decides.
+    monkeypatch.setattr(pip_module, "_packaging_version", None)
+    assert pip_module._is_newer("2.0", "1.0") is None
+    assert PipUpdatesRunner().is_outdated("pkg") is True
+
+
+def test_latest_version_caches_answers_per_runner(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    requests: list[str] = []
+
+    def fake_urlopen(url: str, *, timeout: float) -> io.BytesIO:
+        del timeout
+        requests.append(url)
+        return io.BytesIO(json.dumps({"info": {"version": "3.1"}}).encode())
+
+    monkeypatch.setattr(pip_module.urllib.request, "urlopen", fake_urlopen)
+    runner = PipUpdatesRunner()
+
+    assert runner._latest_version("Some_Pkg") == "3.1"
+    assert runner._latest_version("some-pkg") == "3.1"
+    assert requests == ["https://pypi.org/pypi/some-pkg/json"]
+    assert PipUpdatesRunner()._latest_version("some-pkg") == "3.1"
+    assert requests == ["https://pypi.org/pypi/some-pkg/json"] * 2
+
+
+def test_latest_pypi_version_treats_http_errors_as_unknown(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    def broken_urlopen(url: str, *, timeout: float) -> io.BytesIO:
+        del url, timeout
+        partial = b""
+        raise pip_module.http.client.IncompleteRead(partial)
+
+    monkeypatch.setattr(pip_module.urllib.request, "urlopen", broken_urlopen)
+
+    assert pip_module._latest_pypi_version("pkg") is None
 
 
 def test_batch_install_deduplicates_packages(
@@ -112,10 +226,10 @@ def test_batch_install_deduplicates_packages(
     pip_calls: list[list[str]] = []
 
     def fake_refresh(
-        _self: PipUpdatesRunner, package: str, *, use_user: bool
-    ) -> pip_module.InstallResult:
-        pip_calls.append([package, str(use_user)])
-        return pip_module.InstallResult(package, "1.0", "2.0", 0)
+        _self: PipUpdatesRunner, packages: list[str], *, use_user: bool
+    ) -> list[pip_module.InstallResult]:
+        pip_calls.append([*packages, str(use_user)])
+        return [pip_module.InstallResult(pkg, "1.0", "2.0", 0) for pkg in packages]
 
     def fake_run_report(
         _self: PipUpdatesRunner,
@@ -123,13 +237,72 @@ def test_batch_install_deduplicates_packages(
     ) -> tuple[int, str, str]:
         return 0, "", ""
 
-    monkeypatch.setattr(PipUpdatesRunner, "_refresh_package", fake_refresh)
+    monkeypatch.setattr(PipUpdatesRunner, "_refresh_packages", fake_refresh)
     monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
 
     exit_code = runner.batch_install(["foo", "bar", "foo"], use_user=False)
 
     assert exit_code == 0
-    assert pip_calls == [["foo", "False"], ["bar", "False"]]
+    assert pip_calls == [["foo", "bar", "False"]]
+
+
+def test_batch_install_can_skip_pip_self_upgrade(
+    monkeypatch: MonkeyPatch, runner: PipUpdatesRunner
+) -> None:
+    commands: list[list[str]] = []
+
+    def fake_refresh(
+        _self: PipUpdatesRunner, packages: list[str], *, use_user: bool
+    ) -> list[pip_module.InstallResult]:
+        del use_user
+        return [pip_module.InstallResult(pkg, "1.0", "2.0", 0) for pkg in packages]
+
+    def fake_run_report(
+        _self: PipUpdatesRunner,
+        cmd: list[str],
+    ) -> tuple[int, str, str]:
+        commands.append(list(cmd))
+        return 0, "", ""
+
+    monkeypatch.setattr(PipUpdatesRunner, "_refresh_packages", fake_refresh)
+    monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
+
+    assert runner.batch_install(["foo==1.0"], use_user=False, upgrade_pip=False) == 0
+    assert commands == []
+
+
+def test_batch_install_skips_pip_for_empty_batch(
+    monkeypatch: MonkeyPatch, runner: PipUpdatesRunner
+) -> None:
+    def fail_run_report(
+        _self: PipUpdatesRunner,
+        _cmd: list[str],
+    ) -> tuple[int, str, str]:
+        message = "pip should not run for an empty batch"
+        raise AssertionError(message)
+
+    monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fail_run_report)
+
+    assert runner.batch_install([], use_user=False) == 0
+
+
+def test_pip_install_passes_version_check_flag_once(
+    monkeypatch: MonkeyPatch, runner: PipUpdatesRunner
+) -> None:
+    commands: list[list[str]] = []
+
+    def fake_run_report(
+        _self: PipUpdatesRunner,
+        cmd: list[str],
+    ) -> tuple[int, str, str]:
+        commands.append(list(cmd))
+        return 0, "", ""
+
+    monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
+
+    assert runner.pip_install("foo", upgrade=True) == 0
+    assert commands[0].count("--disable-pip-version-check") == 1
+    assert commands[0][-2:] == ["--upgrade", "foo"]
 
 
 def test_summarize_reports_failures(monkeypatch: MonkeyPatch) -> None:
@@ -177,11 +350,11 @@ def test_run_executes_pip_and_returns_result(monkeypatch: MonkeyPatch) -> None:
     assert (code, out, err) == (0, "ok", "")
 
 
-def test_refresh_package_uses_install_result(monkeypatch: MonkeyPatch) -> None:
+def test_refresh_packages_passes_user_flag(monkeypatch: MonkeyPatch) -> None:
     calls: list[list[str]] = []
 
-    def fake_version(name: str) -> str | None:
-        return "1.0" if name == "foo" else "2.0"
+    def fake_versions(names: list[str]) -> dict[str, str | None]:
+        return dict.fromkeys(names, "1.0")
 
     def fake_run_report(
         _self: PipUpdatesRunner,
@@ -191,16 +364,97 @@ def test_refresh_package_uses_install_result(monkeypatch: MonkeyPatch) -> None:
         return 0, "", ""
 
     monkeypatch.setattr(
-        PipUpdatesRunner, "get_installed_version", staticmethod(fake_version)
+        PipUpdatesRunner, "_installed_versions", staticmethod(fake_versions)
     )
     monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
 
-    result = PipUpdatesRunner()._refresh_package(
-        "foo", use_user=True
+    (result,) = PipUpdatesRunner()._refresh_packages(
+        ["foo"], use_user=True
     )  # pyright: ignore[reportPrivateUsage]
 
     assert isinstance(result, pip_module.InstallResult)
-    assert result.prev == "1.0"
-    assert result.curr == "1.0"
-    assert calls
+    assert (result.prev, result.curr) == ("1.0", "1.0")
+    assert len(calls) == 1
     assert "--user" in calls[0]
+
+
+def test_refresh_packages_runs_single_pip_invocation(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_versions(names: list[str]) -> dict[str, str | None]:
+        return dict.fromkeys(names)
+
+    def fake_run_report(
+        _self: PipUpdatesRunner,
+        cmd: list[str],
+    ) -> tuple[int, str, str]:
+        calls.append(list(cmd))
+        return 1, "", ""
+
+    monkeypatch.setattr(
+        PipUpdatesRunner, "_installed_versions", staticmethod(fake_versions)
+    )
+    monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
+
+    results = PipUpdatesRunner()._refresh_packages(
+        ["foo", "bar"], use_user=False
+    )  # pyright: ignore[reportPrivateUsage]
+
+    assert len(calls) == 1
+    assert calls[0][-2:] == ["foo", "bar"]
+    assert [result.name for result in results] == ["foo", "bar"]
+    assert all(result.code == 1 for result in results)
+
+
+def test_refresh_packages_looks_up_versions_by_bare_name(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    lookups: list[list[str]] = []
+
+    def fake_versions(names: list[str]) -> dict[str, str | None]:
+        lookups.append(list(names))
+        return dict.fromkeys(names, "1.0")
+
+    def fake_run_report(
+        _self: PipUpdatesRunner,
+        _cmd: list[str],
+    ) -> tuple[int, str, str]:
+        return 0, "", ""
+
+    monkeypatch.setattr(
+        PipUpdatesRunner, "_installed_versions", staticmethod(fake_versions)
+    )
+    monkeypatch.setattr(PipUpdatesRunner, "_run_and_report", fake_run_report)
+
+    results = PipUpdatesRunner()._refresh_packages(
+        ["foo==1.0", "bar[extra]>=2"], use_user=False
+    )  # pyright: ignore[reportPrivateUsage]
+
+    assert lookups == [["foo", "bar"], ["foo", "bar"]]
+    assert [(result.name, result.prev) for result in results] == [
+        ("foo==1.0", "1.0"),
+        ("bar[extra]>=2", "1.0"),
+    ]
+
+
+def test_installed_versions_looks_up_each_name(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    lookups: list[str] = []
+
+    def fake_version(name: str) -> str:
+        lookups.append(name)
+        if name == "missing":
+            raise PackageNotFoundError(name)
+        return "1.2"
+
+    monkeypatch.setattr(pip_module, "_version", fake_version)
+
+    versions = PipUpdatesRunner._installed_versions(
+        ["some.pkg", "missing"]
+    )  # pyright: ignore[reportPrivateUsage]
+
+    assert versions == {"some.pkg": "1.2", "missing": None}
+    assert lookups == ["some.pkg", "missing"]
@@ -0,0 +1,397 @@
+"""Tests for the pip updates orchestration flow."""
+
+# ruff: noqa: S101, SLF001 - assertions and private member access are OK in tests
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+
+from x_make_pip_updates_x import update_flow
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from _pytest.monkeypatch import MonkeyPatch
+
+_DEEP_NESTING = 5000
+
+
+class _RecordingRunner:
+    def __init__(self, rc: int = 0) -> None:
+        self.calls: list[tuple[list[str], bool]] = []
+        self.rc = rc
+
+    def batch_install(self, packages: Sequence[str], *, use_user: bool) -> int:
+        self.calls.append((list(packages), use_user))
+        return self.rc
+
+
+class _UpgradeAwareRunner(_RecordingRunner):
+    def __init__(self) -> None:
+        super().__init__()
+        self.upgrade_flags: list[bool] = []
+
+    def batch_install(
+        self,
+        packages: Sequence[str],
+        *,
+        use_user: bool,
+        upgrade_pip: bool = True,
+    ) -> int:
+        self.upgrade_flags.append(upgrade_pip)
+        return super().batch_install(packages, use_user=use_user)
+
+
+def _retry_config(*, use_user_flag: bool) -> update_flow._UpdateExecutionConfig:
+    return update_flow._UpdateExecutionConfig(
+        pip_updates_factory=update_flow._default_runner_factory,
+        ctx=None,
+        use_user_flag=use_user_flag,
+        script_path=Path("missing_script.py"),
+        script_exists=True,
+    )
+
+
+def _fake_versions(
+    versions: dict[str, str],
+    lookups: list[str] | None = None,
+) -> Callable[[str], str]:
+    def fake_version(name: str) -> str:
+        if lookups is not None:
+            lookups.append(name)
+        try:
+            return versions[name]
+        except KeyError:
+            raise update_flow.importlib_metadata.PackageNotFoundError(name) from None
+
+    return fake_version
+
+
+def test_retry_mismatches_reuses_runner_in_process(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    def fail_run_command(*_args: object, **_kwargs: object) -> object:
+        message = "retry should not spawn the pip-updates script"
+        raise AssertionError(message)
+
+    monkeypatch.setattr(update_flow, "run_command", fail_run_command)
+    runner = _RecordingRunner()
+    upgrade_aware = _UpgradeAwareRunner()
+
+    for candidate in (runner, upgrade_aware):
+        rc = update_flow._retry_mismatches(  # pyright: ignore[reportPrivateUsage]
+            [("foo", "1.0", "0.9")],
+            runner=candidate,
+            config=_retry_config(use_user_flag=True),
+        )
+        assert rc == 0
+
+    assert runner.calls == [(["foo==1.0"], True)]
+    assert upgrade_aware.calls == [(["foo==1.0"], True)]
+    assert upgrade_aware.upgrade_flags == [False]
+
+
+def test_prepare_execution_skips_pip_when_packages_are_current(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    def fail_pip(
+        *_args: object, **_kwargs: object
+    ) -> update_flow.PipUpdatesRunnerProtocol:
+        message = "no pip call expected when every package is current"
+        raise AssertionError(message)
+
+    monkeypatch.setattr(
+        update_flow.importlib_metadata, "version", _fake_versions({"foo": "1.0"})
+    )
+    monkeypatch.setattr(update_flow, "_fallback_pip_install", fail_pip)
+    config = update_flow._UpdateExecutionConfig(
+        pip_updates_factory=fail_pip,
+        ctx=None,
+        use_user_flag=False,
+        script_path=Path(__file__),
+        script_exists=True,
+    )
+
+    execution, result = update_flow._prepare_update_execution_details(
+        ["foo"],
+        {"foo": "1.0"},
+        {},
+        config=config,
+    )
+
+    assert execution["script_attempt"] == {"invoked": False, "return_code": None}
+    assert execution["fallback"] == {"invoked": False, "pinned": [], "loose": []}
+    assert result["final_versions"] == {"foo": "1.0"}
+    assert result["any_failures"] is False
+    assert result["verification"] == {
+        "status": "skipped",
+        "reason": "verification not requested",
+    }
+
+
+def test_prepare_execution_rereads_every_package_after_retry(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    installed = {"foo": "0.9", "dep": "1.0"}
+    installs: list[list[str]] = []
+
+    def fake_fallback(
+        packages: Sequence[str],
+        _published: object,
+        *,
+        use_user_flag: bool,
+    ) -> list[str]:
+        del use_user_flag
+        installs.append(list(packages))
+        if len(installs) > 1:
+            # The retry of foo also upgrades its dependency.
+            installed.update(foo="1.0", dep="2.0")
+        return []
+
+    monkeypatch.setattr(
+        update_flow.importlib_metadata, "version", _fake_versions(installed)
+    )
+    monkeypatch.setattr(update_flow, "_fallback_pip_install", fake_fallback)
+    config = update_flow._UpdateExecutionConfig(
+        pip_updates_factory=update_flow._default_runner_factory,
+        ctx=None,
+        use_user_flag=False,
+        script_path=Path("missing_script.py"),
+        script_exists=False,
+    )
+
+    _, result = update_flow._prepare_update_execution_details(
+        ["foo", "dep"],
+        {"foo": "1.0", "dep": None},
+        {},
+        config=config,
+    )
+
+    assert installs == [["foo", "dep"], ["foo"]]
+    assert result["initial_versions"] == {"foo": "0.9", "dep": "1.0"}
+    assert result["final_versions"] == {"foo": "1.0", "dep": "2.0"}
+
+
+def test_override_use_user_flag_accepts_shared_truthy_strings() -> None:
+    for raw in ("1", "true", "Yes", " on "):
+        ctx = {"publish_opts": {"use_user": raw}}
+        assert update_flow._override_use_user_flag(ctx, default=False)
+    off = {"publish_opts": {"use_user": "off"}}
+    assert not update_flow._override_use_user_flag(off, default=True)
+
+
+def test_json_ready_handles_nested_and_deep_payloads() -> None:
+    payload = {"b": [Path("pkg"), (1, None)], "a": {2: {"flag": True}}}
+
+    assert update_flow._json_ready(payload) == {
+        "b": ["pkg", [1, None]],
+        "a": {"2": {"flag": True}},
+    }
+    assert list(cast("dict[str, object]", update_flow._json_ready(payload))) == [
+        "b",
+        "a",
+    ]
+
+    deep: list[object] = []
+    cursor = deep
+    for _ in range(_DEEP_NESTING):
+        child: list[object] = []
+        cursor.append(child)
+        cursor = child
+    converted = update_flow._json_ready(deep)
+    depth = 0
+    while converted:
+        converted = cast("list[object]", converted)[0]
+        depth += 1
+    assert depth == _DEEP_NESTING
+
+
+def test_json_ready_rejects_cycles_but_allows_shared_references() -> None:
+    shared: list[object] = [1]
+    assert update_flow._json_ready({"x": shared, "y": [shared]}) == {
+        "x": [1],
+        "y": [[1]],
+    }
+
+    looped: list[object] = []
+    looped.append(looped)
+    nested: dict[str, object] = {}
+    nested["child"] = [{"parent": nested}]
+    for cyclic in (looped, nested):
+        with pytest.raises(ValueError, match="Circular reference"):
+            update_flow._json_ready(cyclic)
+
+
+def test_instantiate_runner_calls_factory_once_with_accepted_kwargs() -> None:
+    calls: list[dict[str, object]] = []
+
+    def ctx_only_factory(*, ctx: object | None) -> _RecordingRunner:
+        calls.append({"ctx": ctx})
+        return _RecordingRunner()
+
+    marker = object()
+    runner = update_flow._instantiate_runner(
+        # The narrow signature is the point of the test, so it is cast rather
+        # than widened to match the protocol.
+        cast("update_flow.PipUpdatesFactory", ctx_only_factory),
+        ctx=marker,
+        use_user_flag=True,
+    )
+
+    assert isinstance(runner, _RecordingRunner)
+    assert calls == [{"ctx": marker}]
+
+
+def test_resolve_script_path_rechecks_cached_hits(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    hits: dict[tuple[str, str], Path] = {}
+    monkeypatch.setattr(update_flow, "_script_path_hits", hits)
+    script = tmp_path / "x_make_pip_updates_x" / "x_cls_make_pip_updates_x.py"
+
+    missing = tmp_path / "x_4357_make_pip_updates_x" / "x_cls_make_pip_updates_x.py"
+    assert update_flow._resolve_script_path(tmp_path) == (missing, False)
+    assert not hits
+
+    script.parent.mkdir()
+    script.write_text("", encoding="utf-8")
+    assert update_flow._resolve_script_path(tmp_path) == (script, True)
+    assert list(hits.values()) == [script]
+
+    assert update_flow._resolve_script_path(tmp_path) == (script, True)
+
+    script.unlink()
+    assert update_flow._resolve_script_path(tmp_path) == (missing, False)
+    assert not hits
+
+
+def test_instantiate_runner_drops_keywords_rejected_behind_kwargs() -> None:
+    calls: list[dict[str, object]] = []
+
+    def forwarding_factory(**kwargs: object) -> _RecordingRunner:
+        calls.append(dict(kwargs))
+        if "ctx" in kwargs:
+            message = "_RecordingRunner() got an unexpected keyword argument 'ctx'"
+            raise TypeError(message)
+        return _RecordingRunner()
+
+    runner = update_flow._instantiate_runner(
+        cast("update_flow.PipUpdatesFactory", forwarding_factory),
+        ctx=None,
+        use_user_flag=False,
+    )
+
+    assert isinstance(runner, _RecordingRunner)
+    assert calls == [{"user": False, "ctx": None}, {"user": False}]
+
+
+def test_instantiate_runner_falls_back_to_a_bare_call() -> None:
+    calls: list[dict[str, object]] = []
+
+    def picky_factory(**kwargs: object) -> _RecordingRunner:
+        calls.append(dict(kwargs))
+        if kwargs:
+            message = "runner options are not supported"
+            raise TypeError(message)
+        return _RecordingRunner()
+
+    def broken_factory(**kwargs: object) -> _RecordingRunner:
+        del kwargs
+        message = "runner options are not supported"
+        raise TypeError(message)
+
+    runner = update_flow._instantiate_runner(
+        cast("update_flow.PipUpdatesFactory", picky_factory),
+        ctx=None,
+        use_user_flag=False,
+    )
+
+    assert isinstance(runner, _RecordingRunner)
+    assert calls == [{"user": False, "ctx": None}, {}]
+    with pytest.raises(update_flow.PipUpdatesInstantiationError):
+        update_flow._instantiate_runner(
+            cast("update_flow.PipUpdatesFactory", broken_factory),
+            ctx=None,
+            use_user_flag=False,
+        )
+
+
+def test_validate_input_payload_collects_all_errors() -> None:
+    required = [
+        "packages",
+        "repo_parent_root",
+        "published_versions",
+        "published_artifacts",
+    ]
+
+    failure = (
+        update_flow._validate_input_payload(  # pyright: ignore[reportPrivateUsage]
+            {"command": "x_make_pip_updates_x", "parameters": {}}
+        )
+    )
+
+    assert failure is not None
+    assert failure["status"] == "failure"
+    details = failure["details"]
+    assert isinstance(details, dict)
+    assert details["error_count"] == len(required)
+
+
+def test_validate_input_payload_defers_to_jsonschema() -> None:
+    parameters: dict[str, object] = {
+        "packages": ["foo"],
+        "repo_parent_root": "repos",
+        "published_versions": {},
+        "published_artifacts": {},
+    }
+    payload: dict[str, object] = {
+        "command": "x_make_pip_updates_x",
+        "parameters": parameters,
+    }
+    assert update_flow._validate_input_payload(payload) is None
+
+    # fastjsonschema alone would accept a tuple as a JSON array.
+    parameters["packages"] = ("foo",)
+    failure = update_flow._validate_input_payload(payload)
+
+    assert failure is not None
+    details = failure["details"]
+    assert isinstance(details, dict)
+    assert details["path"] == ["parameters", "packages"]
+
+
+class _FakeCommandError(RuntimeError):
+    pass
+
+
+def test_fallback_pip_install_resolves_all_specs_in_one_call(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    commands: list[list[str]] = []
+
+    def fake_run_command(cmd: Sequence[str], *, check: bool) -> object:
+        assert check
+        commands.append(list(cmd))
+        if "--user" in cmd:
+            message = "pip install failed"
+            raise _FakeCommandError(message)
+        return update_flow.SimpleNamespace(stdout="", stderr="")
+
+    monkeypatch.setattr(update_flow, "CommandError", _FakeCommandError)
+    monkeypatch.setattr(update_flow, "run_command", fake_run_command)
+    published = {"foo": "1.0", "bar": None}
+
+    assert not update_flow._fallback_pip_install(
+        ["foo", "bar"], published, use_user_flag=False
+    )
+    assert update_flow._fallback_pip_install(
+        ["foo", "bar"], published, use_user_flag=True
+    ) == ["foo==1.0", "bar"]
+    assert [cmd[-3:] for cmd in commands] == [
+        ["--upgrade", "foo==1.0", "bar"],
+        ["--user", "foo==1.0", "bar"],
+    ]
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import importlib
 import importlib.metadata as importlib_metadata
+import inspect
 import json
 import os
 import subprocess
 import sys
+import time
 import uuid
-from collections.abc import Iterable, Mapping, Sequence
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
 from contextlib import suppress
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from types import MappingProxyType, SimpleNamespace
 from typing import Final, NamedTuple, Protocol, cast
@@ -23,11 +27,12 @@ from x_make_common_x import (
     run_command,
     write_run_report,
 )
-from x_make_common_x.json_contracts import validate_payload
 from x_make_pip_updates_x.json_contracts import (
-    ERROR_SCHEMA,
-    INPUT_SCHEMA,
-    OUTPUT_SCHEMA,
+    is_valid_input,
+    is_valid_output,
+    iter_input_errors,
+    iter_output_errors,
+    validate_error,
 )
 
 
@@ -41,12 +46,25 @@ class _JsonschemaModule(Protocol):
     ValidationError: type[Exception]
 
 
+class _JsonschemaExceptionsModule(Protocol):
+    def best_match(self, errors: Iterable[Exception]) -> Exception | None: ...
+
+
 def _load_validation_error() -> type[Exception]:
     module = cast("_JsonschemaModule", importlib.import_module("jsonschema"))
     return module.ValidationError
 
 
+def _load_best_match() -> Callable[[Iterable[Exception]], Exception | None]:
+    module = cast(
+        "_JsonschemaExceptionsModule",
+        importlib.import_module("jsonschema.exceptions"),
+    )
+    return module.best_match
+
+
 ValidationErrorType: type[Exception] = _load_validation_error()
+_best_match = _load_best_match()
 
 _EMPTY_DICT: Final[dict[str, object]] = {}
 _EMPTY_MAPPING: Final[Mapping[str, object]] = MappingProxyType(_EMPTY_DICT)
@@ -56,6 +74,12 @@ class PipUpdatesRunnerProtocol(Protocol):
     def batch_install(self, packages: Sequence[str], *, use_user: bool) -> int: ...
 
 
+class _PipUpgradeAwareRunner(Protocol):
+    def batch_install(
+        self, packages: Sequence[str], *, use_user: bool, upgrade_pip: bool
+    ) -> int: ...
+
+
 class PipUpdatesFactory(Protocol):
     def __call__(self, *args: object, **kwargs: object) -> PipUpdatesRunnerProtocol: ...
 
@@ -88,6 +112,15 @@ def _select_factory(custom_factory: PipUpdatesFactory | None) -> PipUpdatesFacto
 
 
 PACKAGE_ROOT = Path(__file__).resolve().parent
+# Shared with x_cls_make_pip_updates_x. The interpreter never changes for the
+# life of the process, and batch_install upgrades pip explicitly, so pip's own
+# self-update probe is pure overhead.
+PIP_COMMAND: Final[tuple[str, ...]] = (
+    sys.executable,
+    "-m",
+    "pip",
+    "--disable-pip-version-check",
+)
 
 
 def _info(*parts: object) -> None:
@@ -98,26 +131,93 @@ def _error(*parts: object) -> None:
     log_error(*parts)
 
 
-def _json_ready(value: object) -> object:
-    if value is None or isinstance(value, (str, int, float, bool)):
-        return value
-    if isinstance(value, Path):
-        return str(value)
+_JSON_LEAF: Final = 0
+_JSON_MAPPING: Final = 1
+_JSON_SEQUENCE: Final = 2
+_JSON_STRINGIFY: Final = 3
+# Exact-type lookup for the common cases; subclasses fall through to the
+# isinstance chain in _json_kind.
+_JSON_KINDS: Final[Mapping[type, int]] = MappingProxyType(
+    {
+        type(None): _JSON_LEAF,
+        str: _JSON_LEAF,
+        int: _JSON_LEAF,
+        float: _JSON_LEAF,
+        bool: _JSON_LEAF,
+        dict: _JSON_MAPPING,
+        MappingProxyType: _JSON_MAPPING,
+        list: _JSON_SEQUENCE,
+        tuple: _JSON_SEQUENCE,
+    }
+)
+
+_JSON_SCALAR_TYPES: Final = (str, int, float, bool)
+_JSON_SEQUENCE_EXCLUDED: Final = (bytes, bytearray)
+
+_JsonTarget = dict[str, object] | list[object]
+# Work items are (source, target) pairs; a None target marks the point where
+# the container with id ``source`` leaves the active path.
+_JsonPending = deque[tuple[object, _JsonTarget | None]]
+
+
+def _json_kind(value: object) -> int:
+    kind = _JSON_KINDS.get(type(value))
+    if kind is not None:
+        return kind
+    if isinstance(value, _JSON_SCALAR_TYPES):
+        return _JSON_LEAF
     if isinstance(value, Mapping):
-        typed_mapping = cast("Mapping[object, object]", value)
-        normalized_mapping: dict[str, object] = {
-            str(key): _json_ready(val) for key, val in typed_mapping.items()
-        }
-        return normalized_mapping
-    if isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray)):
-        typed_sequence = cast("Sequence[object]", value)
-        normalized_sequence: list[object] = [
-            _json_ready(entry) for entry in typed_sequence
-        ]
-        return normalized_sequence
+        return _JSON_MAPPING
+    if isinstance(value, Sequence) and not isinstance(value, _JSON_SEQUENCE_EXCLUDED):
+        return _JSON_SEQUENCE
+    return _JSON_STRINGIFY
+
+
+def _json_convert(value: object, pending: _JsonPending) -> object:
+    kind = _json_kind(value)
+    if kind == _JSON_LEAF:
+        return value
+    if kind == _JSON_MAPPING:
+        mapping_target: dict[str, object] = {}
+        pending.append((value, mapping_target))
+        return mapping_target
+    if kind == _JSON_SEQUENCE:
+        sequence_target: list[object] = []
+        pending.append((value, sequence_target))
+        return sequence_target
     return str(value)
 
 
+def _json_ready(value: object) -> object:
+    # Containers are emitted empty and filled from a work stack, so deep
+    # payloads never hit the recursion limit and key order is preserved.
+    pending: _JsonPending = deque()
+    # ids of the containers being filled on the current path; shared but
+    # acyclic references are fine, a container inside itself is not.
+    active: set[int] = set()
+    result = _json_convert(value, pending)
+    while pending:
+        source, target = pending.pop()
+        if target is None:
+            active.discard(cast("int", source))
+            continue
+        marker = id(source)
+        if marker in active:
+            message = "Circular reference detected"
+            raise ValueError(message)
+        active.add(marker)
+        # Children are pushed after the marker, so they finish before it pops.
+        pending.append((marker, None))
+        if isinstance(target, dict):
+            typed_mapping = cast("Mapping[object, object]", source)
+            for key, val in typed_mapping.items():
+                target[str(key)] = _json_convert(val, pending)
+        else:
+            typed_sequence = cast("Sequence[object]", source)
+            target.extend(_json_convert(entry, pending) for entry in typed_sequence)
+    return result
+
+
 def _base_path_from_cloner(cloner: object, repo_parent_root: str) -> Path:
     base_path = Path(repo_parent_root)
     target_attr: object = getattr(cloner, "target_dir", None)
@@ -133,17 +233,53 @@ def _base_path_from_cloner(cloner: object, repo_parent_root: str) -> Path:
     return base_path
 
 
-def _resolve_script_path(base_path: Path) -> Path:
-    candidates = (
-        base_path / "x_4357_make_pip_updates_x" / "x_cls_make_pip_updates_x.py",
-        base_path / "x_make_pip_updates_x" / "x_cls_make_pip_updates_x.py",
-        Path.cwd() / "x_4357_make_pip_updates_x" / "x_cls_make_pip_updates_x.py",
-        Path.cwd() / "x_make_pip_updates_x" / "x_cls_make_pip_updates_x.py",
-    )
-    for candidate in candidates:
-        if candidate.exists():
-            return candidate
-    return candidates[0]
+_SCRIPT_DIR_NAMES: Final[tuple[str, ...]] = (
+    "x_4357_make_pip_updates_x",
+    "x_make_pip_updates_x",
+)
+_SCRIPT_FILE_NAME: Final = "x_cls_make_pip_updates_x.py"
+_SCRIPT_RELATIVE_PATHS: Final[tuple[str, ...]] = tuple(
+    os.path.join(dir_name, _SCRIPT_FILE_NAME)  # noqa: PTH118 - str fast path
+    for dir_name in _SCRIPT_DIR_NAMES
+)
+
+
+_SCRIPT_PATH_HITS_MAX: Final = 8
+# Only hits are remembered: a clone made later in the same process must still
+# be discovered, so misses are always probed again.
+_script_path_hits: dict[tuple[str, str], Path] = {}
+
+
+def _find_script_path(base: str, cwd: str) -> Path | None:
+    roots = (base,) if base == cwd else (base, cwd)
+    # Plain strings and os.path.isfile avoid building a Path per probe.
+    for root in roots:
+        for relative in _SCRIPT_RELATIVE_PATHS:
+            candidate = os.path.join(root, relative)  # noqa: PTH118
+            if os.path.isfile(candidate):  # noqa: PTH113
+                return Path(candidate)
+    return None
+
+
+def _resolve_script_path(base_path: Path) -> tuple[Path, bool]:
+    """Return the pip-updates script path and whether it exists."""
+    base = os.fspath(base_path)
+    cwd = os.getcwd()  # noqa: PTH109 - compared as a plain string key
+    key = (base, cwd)
+    cached = _script_path_hits.get(key)
+    if cached is not None:
+        if cached.is_file():
+            return cached, True
+        # The script was removed; forget this entry only and probe again.
+        del _script_path_hits[key]
+    found = _find_script_path(base, cwd)
+    if found is None:
+        return base_path / _SCRIPT_RELATIVE_PATHS[0], False
+    if len(_script_path_hits) >= _SCRIPT_PATH_HITS_MAX:
+        # Dicts keep insertion order, so the first key is the oldest hit.
+        del _script_path_hits[next(iter(_script_path_hits))]
+    _script_path_hits[key] = found
+    return found, True
 
 
 _DEFAULT_PACKAGES: tuple[str, ...] = (
@@ -155,17 +291,18 @@ _DEFAULT_PACKAGES: tuple[str, ...] = (
 )
 
 
+# Truthy spellings for string flags, shared with x_cls_make_pip_updates_x.
+TRUE_STRINGS: Final = frozenset({"1", "true", "yes", "on"})
+
+_DEFAULT_PACKAGES_FILTERED: tuple[str, ...] = tuple(
+    candidate for candidate in _DEFAULT_PACKAGES if candidate.startswith("x_")
+)
+
+
 def _normalize_packages(packages: Sequence[str]) -> list[str]:
-    normalized = [pkg for pkg in packages if pkg]
-    if normalized:
-        deduped: list[str] = []
-        seen: set[str] = set()
-        for pkg in normalized:
-            if pkg not in seen:
-                seen.add(pkg)
-                deduped.append(pkg)
-        return deduped
-    return [candidate for candidate in _DEFAULT_PACKAGES if candidate.startswith("x_")]
+    # dict.fromkeys keeps first-seen order while dropping duplicates.
+    deduped = list(dict.fromkeys(pkg for pkg in packages if pkg))
+    return deduped or list(_DEFAULT_PACKAGES_FILTERED)
 
 
 def _override_use_user_flag(ctx: object | None, *, default: bool) -> bool:
@@ -180,32 +317,77 @@ def _override_use_user_flag(ctx: object | None, *, default: bool) -> bool:
         if isinstance(override, bool):
             return override
         if isinstance(override, str):
-            return override.strip().lower() in {"1", "true", "yes"}
+            return override.strip().lower() in TRUE_STRINGS
     return default
 
 
+_RUNNER_KWARG_NAMES: Final[tuple[str, ...]] = ("user", "ctx")
+_KEYWORD_PARAMETER_KINDS: Final = frozenset(
+    {inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY}
+)
+
+
+@lru_cache(maxsize=8)
+def _factory_kwargs(factory: PipUpdatesFactory) -> tuple[str, ...] | None:
+    """Return the runner kwargs ``factory`` accepts, or None when unknown."""
+    try:
+        parameters = inspect.signature(factory).parameters
+    except (TypeError, ValueError):
+        return None
+    if any(
+        param.kind is inspect.Parameter.VAR_KEYWORD for param in parameters.values()
+    ):
+        # **kwargs may be forwarded to a stricter callee; let probing decide.
+        return None
+    return tuple(
+        name
+        for name in _RUNNER_KWARG_NAMES
+        if name in parameters and parameters[name].kind in _KEYWORD_PARAMETER_KINDS
+    )
+
+
 def _instantiate_runner(
     pip_updates_cls: PipUpdatesFactory,
     *,
     ctx: object | None,
     use_user_flag: bool,
 ) -> PipUpdatesRunnerProtocol:
-    attempt_kwargs: tuple[dict[str, object], ...] = (
-        {"user": use_user_flag, "ctx": ctx},
-        {"user": use_user_flag},
-        {"ctx": ctx},
-        {},
-    )
-    last_exc: TypeError | None = None
-    for kwargs in attempt_kwargs:
+    values: dict[str, object] = {"user": use_user_flag, "ctx": ctx}
+    try:
+        # lru_cache keys need Hashable, which the factory protocol does not
+        # promise; an unhashable factory raises TypeError here instead.
+        accepted = _factory_kwargs(cast("Hashable", pip_updates_cls))
+    except TypeError:
+        # Unhashable factories cannot be memoised; probe them instead.
+        accepted = None
+    if accepted is not None:
+        return pip_updates_cls(**{name: values[name] for name in accepted})
+
+    # Signature unavailable (e.g. C-implemented callables): drop whichever
+    # keyword the factory rejects and retry, at most once per keyword.
+    while values:
         try:
-            return pip_updates_cls(**kwargs)
+            return pip_updates_cls(**values)
         except TypeError as exc:
-            last_exc = exc
-            continue
-    if last_exc is not None:
-        raise last_exc
-    raise PipUpdatesInstantiationError
+            message = str(exc)
+            # Deliberately tied to CPython's wording, "got an unexpected keyword
+            # argument 'ctx'". Any other message skips straight to the bare call.
+            rejected = next((name for name in values if repr(name) in message), None)
+            if rejected is None:
+                break
+            values.pop(rejected)
+    try:
+        return pip_updates_cls()
+    except TypeError as exc:
+        raise PipUpdatesInstantiationError from exc
+
+
+_RUNNER_INVOCATION_ERRORS: Final[tuple[type[Exception], ...]] = (
+    RuntimeError,
+    ValueError,
+    subprocess.SubprocessError,
+    OSError,
+)
 
 
 def _try_run_updates_script(
@@ -214,7 +396,7 @@ def _try_run_updates_script(
     *,
     ctx: object | None,
     use_user_flag: bool,
-) -> tuple[bool, int | None]:
+) -> tuple[bool, int | None, PipUpdatesRunnerProtocol | None]:
     try:
         runner = _instantiate_runner(
             pip_updates_cls,
@@ -226,26 +408,28 @@ def _try_run_updates_script(
             "pip-updates instantiation failed:",
             f"{exc}; switching to fallback pip install",
         )
-        return False, None
+        return False, None, None
     try:
         rc = runner.batch_install(list(packages), use_user=use_user_flag)
-    except (
-        RuntimeError,
-        ValueError,
-        subprocess.SubprocessError,
-        OSError,
-    ) as exc:
+    except _RUNNER_INVOCATION_ERRORS as exc:
         _error(
             "pip-updates invocation failed:",
             f"{exc}; switching to fallback pip install",
         )
-        return False, None
+        return False, None, None
     if rc != 0:
         _error(
             "pip-updates reported non-zero exit; switching to fallback pip install",
         )
-        return True, rc
-    return True, rc
+        return True, rc, runner
+    return True, rc, runner
+
+
+def _installed_version(name: str) -> str | None:
+    try:
+        return importlib_metadata.version(name)
+    except (importlib_metadata.PackageNotFoundError, ValueError):
+        return None
 
 
 def _get_installed_versions(packages: Sequence[str]) -> dict[str, str | None]:
@@ -265,6 +449,23 @@ def _get_installed_versions(packages: Sequence[str]) -> dict[str, str | None]:
     return installed
 
 
+def _pending_packages(
+    packages: Sequence[str],
+    published_versions: Mapping[str, str | None],
+) -> list[str]:
+    """Return packages not yet at their published version.
+
+    Packages without a published pin always stay pending because only pip
+    can tell whether a newer release exists; they are not looked up at all.
+    """
+    return [
+        pkg
+        for pkg in packages
+        if not (expected := published_versions.get(pkg))
+        or _installed_version(pkg) != expected
+    ]
+
+
 def _collect_mismatches(
     expected: Mapping[str, str | None],
     installed: Mapping[str, str | None],
@@ -279,14 +480,45 @@ def _collect_mismatches(
     return mismatches
 
 
-def _retry_mismatches(
-    mismatches: Sequence[tuple[str, str, str | None]],
+def _accepts_keyword(func: Callable[..., object], name: str) -> bool:
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    param = parameters.get(name)
+    return param is not None and param.kind in _KEYWORD_PARAMETER_KINDS
+
+
+def _retry_with_runner(
+    runner: PipUpdatesRunnerProtocol,
+    pinned: Sequence[str],
+    *,
+    use_user_flag: bool,
+) -> int | None:
+    _info(f"Retrying install for pinned versions in-process: {' '.join(pinned)}")
+    try:
+        # The first attempt already upgraded pip. upgrade_pip is not part of
+        # PipUpdatesRunnerProtocol, so only runners that accept it get it.
+        if _accepts_keyword(runner.batch_install, "upgrade_pip"):
+            upgrade_aware = cast("_PipUpgradeAwareRunner", runner)
+            return upgrade_aware.batch_install(
+                list(pinned), use_user=use_user_flag, upgrade_pip=False
+            )
+        return runner.batch_install(list(pinned), use_user=use_user_flag)
+    except _RUNNER_INVOCATION_ERRORS as exc:
+        _error(
+            "pip-updates retry failed:",
+            f"{exc}; retrying through the pip-updates script",
+        )
+        return None
+
+
+def _retry_with_script(
+    pinned: Sequence[str],
     script_path: Path,
     *,
     use_user_flag: bool,
-    final_installed: dict[str, str | None],
 ) -> int:
-    pinned = [f"{pkg}=={version}" for pkg, version, _ in mismatches]
     retry_cmd = [sys.executable, str(script_path)]
     if use_user_flag:
         retry_cmd.append("--user")
@@ -297,46 +529,64 @@ def _retry_mismatches(
         _info(retry_proc.stdout.strip())
     if retry_proc.stderr:
         _error(retry_proc.stderr.strip())
-    for pkg_name, _, _ in mismatches:
-        try:
-            final_installed[pkg_name] = importlib_metadata.version(pkg_name)
-        except importlib_metadata.PackageNotFoundError:
-            final_installed[pkg_name] = None
     return retry_proc.returncode
 
 
+def _retry_mismatches(
+    mismatches: Sequence[tuple[str, str, str | None]],
+    *,
+    runner: PipUpdatesRunnerProtocol | None,
+    config: _UpdateExecutionConfig,
+) -> int:
+    pinned = [f"{pkg}=={version}" for pkg, version, _ in mismatches]
+    # Reuse the runner that already served the first attempt so the retry
+    # does not pay for another interpreter start and pip import.
+    retry_rc: int | None = None
+    if runner is not None:
+        retry_rc = _retry_with_runner(
+            runner, pinned, use_user_flag=config.use_user_flag
+        )
+    if retry_rc is None:
+        retry_rc = _retry_with_script(
+            pinned, config.script_path, use_user_flag=config.use_user_flag
+        )
+    return retry_rc
+
+
 def _fallback_pip_install(
     packages: Sequence[str],
     published_versions: Mapping[str, str | None],
     *,
     use_user_flag: bool,
-) -> None:
-    python = sys.executable
-    base_cmd = [python, "-m", "pip", "install", "--upgrade"]
-    if use_user_flag:
-        base_cmd.append("--user")
-
+) -> list[str]:
+    """Install ``packages`` via pip and return the specs that failed."""
     pinned = [
         f"{pkg}=={published_versions[pkg]}"
         for pkg in packages
         if published_versions.get(pkg)
     ]
     loose = [pkg for pkg in packages if not published_versions.get(pkg)]
+    specs = pinned + loose
+    if not specs:
+        return []
 
-    for batch in (pinned, loose):
-        if not batch:
-            continue
-        cmd = base_cmd + batch
-        _info("Fallback pip install:", " ".join(cmd))
-        try:
-            proc = run_command(cmd, check=True)
-        except CommandError as exc:
-            _error(str(exc))
-            continue
-        if proc.stdout:
-            _info(proc.stdout.strip())
-        if proc.stderr:
-            _error(proc.stderr.strip())
+    # Pinned and loose specs are independent, so one pip call resolves them
+    # together: one resolver pass, one index session, one cache lock.
+    cmd = [*PIP_COMMAND, "install", "--upgrade"]
+    if use_user_flag:
+        cmd.append("--user")
+    cmd.extend(specs)
+    _info("Fallback pip install:", " ".join(cmd))
+    try:
+        proc = run_command(cmd, check=True)
+    except CommandError as exc:
+        _error(str(exc))
+        return specs
+    if proc.stdout:
+        _info(proc.stdout.strip())
+    if proc.stderr:
+        _error(proc.stderr.strip())
+    return []
 
 
 def _print_summary(
@@ -372,6 +622,8 @@ class _UpdateExecutionConfig(NamedTuple):
     ctx: object | None
     use_user_flag: bool
     script_path: Path
+    script_exists: bool
+    verify: bool = False
 
 
 def _perform_post_install_verification(
@@ -407,21 +659,34 @@ def _perform_post_install_verification(
     }
 
 
-def _prepare_update_execution_details(
-    package_list: Sequence[str],
+class _InstallPhase(NamedTuple):
+    used_script: bool
+    script_rc: int | None
+    runner: PipUpdatesRunnerProtocol | None
+    used_fallback: bool
+    script_detail: dict[str, object]
+    fallback_detail: dict[str, object]
+
+
+def _run_install_phase(
+    todo: Sequence[str],
     published_versions: Mapping[str, str | None],
-    published_artifacts: Mapping[str, Mapping[str, object]],
     *,
     config: _UpdateExecutionConfig,
-) -> tuple[dict[str, object], dict[str, object]]:
-    script_exists = config.script_path.is_file()
+) -> _InstallPhase:
     used_script = False
     script_rc: int | None = None
-    script_detail: dict[str, object]
-    if script_exists:
-        used_script, script_rc = _try_run_updates_script(
+    runner: PipUpdatesRunnerProtocol | None = None
+    script_detail: dict[str, object] = {
+        "invoked": False,
+        "return_code": None,
+    }
+    if not todo:
+        _info("All packages already at their published versions; skipping pip")
+    elif config.script_exists:
+        used_script, script_rc, runner = _try_run_updates_script(
             config.pip_updates_factory,
-            package_list,
+            todo,
             ctx=config.ctx,
             use_user_flag=config.use_user_flag,
         )
@@ -431,31 +696,95 @@ def _prepare_update_execution_details(
         }
     else:
         _info("pip-updates script not found; using direct pip fallback installation")
-        script_detail = {
-            "invoked": False,
-            "return_code": None,
-        }
 
     pinned = [
         f"{pkg}=={published_versions[pkg]}"
-        for pkg in package_list
+        for pkg in todo
         if published_versions.get(pkg)
     ]
-    loose = [pkg for pkg in package_list if not published_versions.get(pkg)]
+    loose = [pkg for pkg in todo if not published_versions.get(pkg)]
 
-    used_fallback = (not used_script) or (script_rc not in (None, 0))
+    used_fallback = bool(todo) and ((not used_script) or (script_rc not in (None, 0)))
     fallback_detail: dict[str, object] = {
         "invoked": used_fallback,
         "pinned": pinned,
         "loose": loose,
     }
     if used_fallback:
-        _fallback_pip_install(
-            package_list,
+        fallback_failed = _fallback_pip_install(
+            todo,
             published_versions,
             use_user_flag=config.use_user_flag,
         )
+        if fallback_failed:
+            fallback_detail["failed"] = fallback_failed
+    return _InstallPhase(
+        used_script,
+        script_rc,
+        runner,
+        used_fallback,
+        script_detail,
+        fallback_detail,
+    )
+
 
+def _run_retry_phase(
+    mismatches: Sequence[tuple[str, str, str | None]],
+    published_versions: Mapping[str, str | None],
+    *,
+    install: _InstallPhase,
+    config: _UpdateExecutionConfig,
+) -> tuple[int, dict[str, object]]:
+    retried = [pkg for pkg, _, _ in mismatches]
+    if install.used_script and not install.used_fallback and config.script_exists:
+        retry_rc = _retry_mismatches(
+            mismatches,
+            runner=install.runner,
+            config=config,
+        )
+        mode = "script"
+    else:
+        _info("Retrying mismatches with pinned fallback pip install")
+        retry_failed = _fallback_pip_install(
+            retried,
+            published_versions,
+            use_user_flag=config.use_user_flag,
+        )
+        retry_rc = 1 if retry_failed else 0
+        mode = "fallback"
+    return retry_rc, {
+        "mode": mode,
+        "return_code": retry_rc,
+        "packages": retried,
+    }
+
+
+def _verification_detail(
+    package_list: Sequence[str],
+    published_artifacts: Mapping[str, Mapping[str, object]],
+    *,
+    verify: bool,
+) -> dict[str, object]:
+    if not verify:
+        return {
+            "status": "skipped",
+            "reason": "verification not requested",
+        }
+    return _perform_post_install_verification(package_list, published_artifacts)
+
+
+def _prepare_update_execution_details(
+    package_list: Sequence[str],
+    published_versions: Mapping[str, str | None],
+    published_artifacts: Mapping[str, Mapping[str, object]],
+    *,
+    config: _UpdateExecutionConfig,
+) -> tuple[dict[str, object], dict[str, object]]:
+    todo = _pending_packages(package_list, published_versions)
+    install = _run_install_phase(todo, published_versions, config=config)
+
+    # Every name is read again after each pip phase: pip may also have moved
+    # dependencies that appear elsewhere in the package list.
     initial_installed = _get_installed_versions(package_list)
     mismatches = _collect_mismatches(published_versions, initial_installed)
     final_installed = dict(initial_installed)
@@ -469,36 +798,18 @@ def _prepare_update_execution_details(
         for pkg, expected, observed in mismatches
     ]
 
+    execution_updates: dict[str, object] = {
+        "script_attempt": install.script_detail,
+        "fallback": install.fallback_detail,
+    }
     if mismatches:
-        if used_script and not used_fallback and script_exists:
-            retry_rc = _retry_mismatches(
-                mismatches,
-                config.script_path,
-                use_user_flag=config.use_user_flag,
-                final_installed=final_installed,
-            )
-            retry_detail: dict[str, object] = {
-                "mode": "script",
-                "return_code": retry_rc,
-                "packages": [entry["package"] for entry in mismatch_entries],
-            }
-        else:
-            _info("Retrying mismatches with pinned fallback pip install")
-            _fallback_pip_install(
-                [pkg for pkg, _, _ in mismatches],
-                published_versions,
-                use_user_flag=config.use_user_flag,
-            )
-            final_installed.update(_get_installed_versions(package_list))
-            retry_rc = 0
-            retry_detail = {
-                "mode": "fallback",
-                "return_code": retry_rc,
-                "packages": [entry["package"] for entry in mismatch_entries],
-            }
-        execution_retry = retry_detail
-    else:
-        execution_retry = {}
+        retry_rc, execution_updates["retry"] = _run_retry_phase(
+            mismatches,
+            published_versions,
+            install=install,
+            config=config,
+        )
+        final_installed.update(_get_installed_versions(package_list))
 
     any_failures = _print_summary(
         published_versions,
@@ -506,33 +817,51 @@ def _prepare_update_execution_details(
         package_list,
         retry_rc,
     )
-    verification_detail = _perform_post_install_verification(
-        package_list,
-        published_artifacts,
-    )
-
-    execution_updates: dict[str, object] = {
-        "script_attempt": script_detail,
-        "fallback": fallback_detail,
-    }
-    if execution_retry:
-        execution_updates["retry"] = execution_retry
-
     result_updates: dict[str, object] = {
         "status": "completed" if not any_failures else "attention",
-        "script_return_code": script_rc,
-        "used_script": used_script,
-        "fallback_used": used_fallback,
+        "script_return_code": install.script_rc,
+        "used_script": install.used_script,
+        "fallback_used": install.used_fallback,
         "retry_return_code": retry_rc,
         "any_failures": any_failures,
-        "initial_versions": _json_ready(dict(initial_installed)),
-        "final_versions": _json_ready(dict(final_installed)),
+        # Version maps are fresh dicts of str | None; already JSON-ready.
+        "initial_versions": initial_installed,
+        "final_versions": final_installed,
         "mismatches": mismatch_entries,
-        "verification": verification_detail,
+        "verification": _verification_detail(
+            package_list,
+            published_artifacts,
+            verify=config.verify,
+        ),
     }
     return execution_updates, result_updates
 
 
+def _run_updates_core(
+    package_list: Sequence[str],
+    published_versions: Mapping[str, str | None],
+    published_artifacts: Mapping[str, Mapping[str, object]],
+    *,
+    config: _UpdateExecutionConfig,
+) -> tuple[dict[str, object], dict[str, object]]:
+    """Return the execution and result report sections for one run.
+
+    Report bookkeeping and error recording stay in run_updates_for_packages.
+    """
+    if not package_list:
+        _info("No published packages to update; skipping pip-updates step")
+        return {}, {
+            "status": "skipped",
+            "reason": "no packages after normalization",
+        }
+    return _prepare_update_execution_details(
+        package_list,
+        published_versions,
+        published_artifacts,
+        config=config,
+    )
+
+
 def run_updates_for_packages(  # noqa: PLR0913
     packages: Sequence[str],
     *,
@@ -542,11 +871,15 @@ def run_updates_for_packages(  # noqa: PLR0913
     published_versions: Mapping[str, str | None],
     published_artifacts: Mapping[str, Mapping[str, object]],
     pip_updates_factory: PipUpdatesFactory,
+    verify: bool = False,
 ) -> Path:
     start_time = datetime.now(UTC)
+    # Elapsed time comes from the monotonic clock so wall-clock adjustments
+    # cannot skew duration_seconds; completed_at is derived from it.
+    start_tick = time.monotonic()
     run_id = uuid.uuid4().hex
     base_path = _base_path_from_cloner(cloner, repo_parent_root)
-    script_path = _resolve_script_path(base_path)
+    script_path, script_exists = _resolve_script_path(base_path)
     package_list = _normalize_packages(packages)
     use_user_flag = _override_use_user_flag(ctx, default=False)
 
@@ -554,13 +887,14 @@ def run_updates_for_packages(  # noqa: PLR0913
         "requested_packages": list(packages),
         "normalized_packages": list(package_list),
         "use_user_flag": use_user_flag,
+        "verify": verify,
         "repo_parent_root": str(repo_parent_root),
-        "published_versions": _json_ready(dict(published_versions)),
-        "published_artifacts": _json_ready(dict(published_artifacts)),
+        "published_versions": _json_ready(published_versions),
+        "published_artifacts": _json_ready(published_artifacts),
     }
     execution_detail: dict[str, object] = {
         "script_path": str(script_path),
-        "script_available": script_path.is_file(),
+        "script_available": script_exists,
     }
     result_detail: dict[str, object] = {}
     report_payload: dict[str, object] = {
@@ -574,53 +908,39 @@ def run_updates_for_packages(  # noqa: PLR0913
     report_path: Path | None = None
     caught_exc: Exception | None = None
     try:
-        if not package_list:
-            _info("No published packages to update; skipping pip-updates step")
-            result_detail.update(
-                {
-                    "status": "skipped",
-                    "reason": "no packages after normalization",
-                }
-            )
-        else:
-            execution_updates, result_updates = _prepare_update_execution_details(
-                package_list,
-                published_versions,
-                published_artifacts,
-                config=_UpdateExecutionConfig(
-                    pip_updates_factory,
-                    ctx,
-                    use_user_flag,
-                    script_path,
-                ),
-            )
-            execution_detail.update(execution_updates)
-            result_detail.update(result_updates)
+        execution_updates, result_updates = _run_updates_core(
+            package_list,
+            published_versions,
+            published_artifacts,
+            config=_UpdateExecutionConfig(
+                pip_updates_factory,
+                ctx,
+                use_user_flag,
+                script_path,
+                script_exists,
+                verify=verify,
+            ),
+        )
+        execution_detail.update(execution_updates)
+        result_detail.update(result_updates)
     except Exception as exc:
         status = "error"
-        errors_list: list[dict[str, object]]
-        errors_entry = report_payload.get("errors")
-        if isinstance(errors_entry, list):
-            errors_list = cast("list[dict[str, object]]", errors_entry)
-        else:
-            errors_list = []
-            report_payload["errors"] = errors_list
-        errors_list.append(
+        # Only this handler records errors, so the list starts fresh here.
+        report_payload["errors"] = [
             {
                 "type": type(exc).__name__,
                 "message": str(exc),
             }
-        )
+        ]
         caught_exc = exc
         raise
     finally:
-        end_time = datetime.now(UTC)
+        elapsed = time.monotonic() - start_tick
         report_payload["status"] = status
-        report_payload["completed_at"] = isoformat_timestamp(end_time)
-        report_payload["duration_seconds"] = round(
-            (end_time - start_time).total_seconds(),
-            3,
+        report_payload["completed_at"] = isoformat_timestamp(
+            start_time + timedelta(seconds=elapsed)
         )
+        report_payload["duration_seconds"] = round(elapsed, 3)
         report_path = write_run_report(
             "x_make_pip_updates_x",
             report_payload,
@@ -648,7 +968,7 @@ def _failure_payload(
     if details:
         payload["details"] = {str(key): value for key, value in details.items()}
     with suppress(ValidationErrorType):
-        validate_payload(payload, ERROR_SCHEMA)
+        validate_error(payload)
     return payload
 
 
@@ -669,32 +989,32 @@ def _parameters_from_payload(payload: Mapping[str, object]) -> Mapping[str, obje
 
 def _coerce_packages(value: object) -> tuple[str, ...]:
     if isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray)):
-        return tuple(str(entry) for entry in value if str(entry))
+        return tuple(text for entry in value if (text := str(entry)))
     return ()
 
 
 def _coerce_published_versions(value: object) -> dict[str, str | None]:
     if not isinstance(value, Mapping):
         return {}
-    result: dict[str, str | None] = {}
-    for key, entry in value.items():
-        coerced: str | None = entry if isinstance(entry, str) and entry else None
-        result[str(key)] = coerced
-    return result
+    typed_value = cast("Mapping[object, object]", value)
+    return {
+        str(key): entry if isinstance(entry, str) and entry else None
+        for key, entry in typed_value.items()
+    }
 
 
 def _coerce_published_artifacts(value: object) -> dict[str, Mapping[str, object]]:
     if not isinstance(value, Mapping):
         return {}
-    result: dict[str, Mapping[str, object]] = {}
-    for key, entry in value.items():
-        if isinstance(entry, Mapping):
-            typed_entry = cast("Mapping[object, object]", entry)
-            sanitized: dict[str, object] = {
-                str(sub_key): sub_value for sub_key, sub_value in typed_entry.items()
-            }
-            result[str(key)] = sanitized
-    return result
+    typed_value = cast("Mapping[object, object]", value)
+    return {
+        str(key): {
+            str(sub_key): sub_value
+            for sub_key, sub_value in cast("Mapping[object, object]", entry).items()
+        }
+        for key, entry in typed_value.items()
+        if isinstance(entry, Mapping)
+    }
 
 
 def _resolve_effective_ctx(
@@ -730,6 +1050,7 @@ class _UpdatesStageParams:
     published_versions: Mapping[str, str | None]
     published_artifacts: Mapping[str, Mapping[str, object]]
     factory: PipUpdatesFactory
+    verify: bool = False
 
 
 class _PipelineError(RuntimeError):
@@ -745,20 +1066,36 @@ def _ensure_success(payload: dict[str, object] | None) -> None:
         raise _PipelineError(payload)
 
 
+def _validation_failure(
+    message: str,
+    errors: Iterable[Exception],
+) -> dict[str, object] | None:
+    collected = list(errors)
+    best = _best_match(collected)
+    if best is None:
+        return None
+    error = cast("_ValidationErrorProtocol", best)
+    return _failure_payload(
+        message,
+        details={
+            "error": error.message,
+            "path": [str(part) for part in error.path],
+            "schema_path": [str(part) for part in error.schema_path],
+            "error_count": len(collected),
+        },
+    )
+
+
 def _validate_input_payload(payload: Mapping[str, object]) -> dict[str, object] | None:
-    try:
-        validate_payload(payload, INPUT_SCHEMA)
-    except ValidationErrorType as exc:
-        error = cast("_ValidationErrorProtocol", exc)
-        return _failure_payload(
-            "input payload failed validation",
-            details={
-                "error": error.message,
-                "path": [str(part) for part in error.path],
-                "schema_path": [str(part) for part in error.schema_path],
-            },
-        )
-    return None
+    # The boolean check accepts only what jsonschema accepts; when it fails,
+    # jsonschema's own error walk decides, so a fast-backend false negative
+    # still validates.
+    if is_valid_input(payload):
+        return None
+    return _validation_failure(
+        "input payload failed validation",
+        iter_input_errors(payload),
+    )
 
 
 def _require_repo_parent_root(
@@ -787,6 +1124,7 @@ def _run_updates_stage(
             published_versions=params.published_versions,
             published_artifacts=params.published_artifacts,
             pip_updates_factory=params.factory,
+            verify=params.verify,
         )
     except Exception as exc:  # noqa: BLE001 - convert to schema failure payload
         return None, _failure_payload(
@@ -803,8 +1141,8 @@ def _load_report_payload(
     report_path: Path,
 ) -> tuple[dict[str, object] | None, dict[str, object] | None]:
     try:
-        with report_path.open("r", encoding="utf-8") as handle:
-            loaded_obj: object = json.load(handle)
+        # json.loads detects UTF-8 bytes itself, skipping the text-mode wrapper.
+        loaded_obj: object = json.loads(report_path.read_bytes())
     except FileNotFoundError:
         return None, _failure_payload(
             "pip updates report not found",
@@ -823,19 +1161,12 @@ def _load_report_payload(
 def _validate_output_payload(
     result_payload: Mapping[str, object],
 ) -> dict[str, object] | None:
-    try:
-        validate_payload(result_payload, OUTPUT_SCHEMA)
-    except ValidationErrorType as exc:
-        error = cast("_ValidationErrorProtocol", exc)
-        return _failure_payload(
-            "generated output failed schema validation",
-            details={
-                "error": error.message,
-                "path": [str(part) for part in error.path],
-                "schema_path": [str(part) for part in error.schema_path],
-            },
-        )
-    return None
+    if is_valid_output(result_payload):
+        return None
+    return _validation_failure(
+        "generated output failed schema validation",
+        iter_output_errors(result_payload),
+    )
 
 
 def main_json(
@@ -897,6 +1228,7 @@ def _main_json_impl(
         published_versions=published_versions,
         published_artifacts=published_artifacts,
         factory=factory,
+        verify=parameters.get("verify") is True,
     )
 
     report_path, stage_error = _run_updates_stage(
@@ -920,6 +1252,8 @@ def _main_json_impl(
 
 
 __all__ = [
+    "PIP_COMMAND",
+    "TRUE_STRINGS",
     "PipUpdatesFactory",
     "PipUpdatesRunnerProtocol",
     "main_json",
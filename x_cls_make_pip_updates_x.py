@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import http.client
+import importlib
 import json
 import logging
+import os
+import re
 import sys
+import time
+import urllib.parse
+import urllib.request
 from collections.abc import Iterable, Mapping, Sequence
 from contextlib import suppress
 from dataclasses import dataclass
@@ -11,14 +18,72 @@ from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _version
 from pathlib import Path
 from types import MappingProxyType
-from typing import IO, cast
+from typing import IO, TYPE_CHECKING, Final, Protocol, cast
 
 from x_make_common_x import CommandError, run_command
-from x_make_pip_updates_x.update_flow import main_json
+from x_make_pip_updates_x.update_flow import PIP_COMMAND, TRUE_STRINGS, main_json
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 _LOGGER = logging.getLogger("x_make")
 _sys = sys
 PACKAGE_ROOT = Path(__file__).resolve().parent
+_DIST_NAME_SEPARATORS = re.compile(r"[-_.]+")
+_OUTDATED_CACHE_TTL_SECONDS: Final[float] = 60.0
+_PYPI_JSON_URL: Final = "https://pypi.org/pypi/{name}/json"
+_PYPI_TIMEOUT_SECONDS: Final[float] = 10.0
+# With a custom index configured, PyPI's answer may not be the one pip sees.
+_INDEX_OVERRIDE_ENV: Final[tuple[str, ...]] = (
+    "PIP_INDEX_URL",
+    "PIP_EXTRA_INDEX_URL",
+    "PIP_FIND_LINKS",
+    "PIP_NO_INDEX",
+)
+# The same settings as they appear in ``pip config list`` (``global.index-url``).
+_INDEX_CONFIG_KEYS: Final = frozenset(
+    {"index-url", "extra-index-url", "find-links", "no-index"}
+)
+# Leading project name of a requirement spec such as ``pkg[extra]>=1.0``.
+_REQUIREMENT_NAME: Final = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+class _OrjsonModule(Protocol):
+    def loads(self, data: str | bytes) -> object: ...
+
+
+def _select_json_loads() -> Callable[[str | bytes], object]:
+    # orjson is optional; its JSONDecodeError subclasses the stdlib one, so
+    # callers catch json.JSONDecodeError for either parser.
+    try:
+        module = cast("_OrjsonModule", importlib.import_module("orjson"))
+    except ImportError:
+        return json.loads
+    return module.loads
+
+
+_json_loads = _select_json_loads()
+
+
+class _Version(Protocol):
+    def __gt__(self, other: _Version, /) -> bool: ...
+
+
+class _PackagingVersionModule(Protocol):
+    InvalidVersion: type[Exception]
+
+    def parse(self, version: str) -> _Version: ...
+
+
+def _load_packaging_version() -> _PackagingVersionModule | None:
+    try:
+        module = importlib.import_module("packaging.version")
+    except ImportError:
+        return None
+    return cast("_PackagingVersionModule", module)
+
+
+_packaging_version = _load_packaging_version()
 
 
 def _info(*args: object) -> None:
@@ -60,6 +125,52 @@ def _error(*args: object) -> None:
 RunResult = tuple[int, str, str]
 
 
+def _normalize_dist_name(name: str) -> str:
+    return _DIST_NAME_SEPARATORS.sub("-", name).lower()
+
+
+def _requirement_name(spec: str) -> str:
+    match = _REQUIREMENT_NAME.match(spec.strip())
+    return match.group(0) if match else spec
+
+
+def _latest_pypi_version(dist_name: str) -> str | None:
+    """Return the latest PyPI release of ``dist_name``, or None if unknown."""
+    url = _PYPI_JSON_URL.format(
+        name=urllib.parse.quote(_normalize_dist_name(dist_name))
+    )
+    try:
+        with urllib.request.urlopen(  # noqa: S310 - fixed https PyPI endpoint
+            url, timeout=_PYPI_TIMEOUT_SECONDS
+        ) as response:
+            payload: object = _json_loads(cast("IO[bytes]", response).read())
+    except (OSError, ValueError, http.client.HTTPException):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    info: object = cast("dict[str, object]", payload).get("info")
+    if not isinstance(info, dict):
+        return None
+    latest: object = cast("dict[str, object]", info).get("version")
+    if not isinstance(latest, str) or not latest:
+        return None
+    return latest
+
+
+def _is_newer(candidate: str, installed: str) -> bool | None:
+    """Return whether ``candidate`` is newer, or None when that is unknown.
+
+    Without packaging, or for versions it cannot parse, there is no safe way
+    to order releases; a plain inequality would flag downgrades as updates.
+    """
+    if _packaging_version is None:
+        return None
+    try:
+        return _packaging_version.parse(candidate) > _packaging_version.parse(installed)
+    except _packaging_version.InvalidVersion:
+        return None
+
+
 @dataclass(slots=True)
 class InstallResult:
     name: str
@@ -89,40 +200,43 @@ class PipUpdatesRunner:
         if isinstance(raw, (int, float)):
             return raw != 0
         if isinstance(raw, str):
-            return raw.lower() in {"1", "true", "yes", "on"}
+            return raw.lower() in TRUE_STRINGS
         return bool(raw)
 
-    def batch_install(self, packages: Sequence[str], *, use_user: bool = False) -> int:
-        # Force pip upgrade first
-        _info("Upgrading pip itself...")
-        pip_upgrade_cmd = [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "--upgrade",
-            "pip",
-        ]
-        pip_upgrade_code = self._run_and_report(pip_upgrade_cmd)[0]
-        if pip_upgrade_code != 0:
-            _info("Failed to upgrade pip. Continuing anyway.")
-
-        seen: set[str] = set()
-        normalized: list[str] = []
-        for pkg in packages:
-            if pkg not in seen:
-                seen.add(pkg)
-                normalized.append(pkg)
+    def batch_install(
+        self,
+        packages: Sequence[str],
+        *,
+        use_user: bool = False,
+        upgrade_pip: bool = True,
+    ) -> int:
+        # Order-preserving dedupe in one pass; checked before the pip
+        # self-upgrade so an empty batch spawns nothing.
+        normalized = list(dict.fromkeys(packages))
         if not normalized:
             _info("No packages supplied; nothing to do.")
             return 0
 
+        # Force pip upgrade first; retries pass upgrade_pip=False because the
+        # first attempt already did it.
+        if upgrade_pip:
+            _info("Upgrading pip itself...")
+            pip_upgrade_cmd = [
+                *PIP_COMMAND,
+                "install",
+                "--upgrade",
+                "pip",
+            ]
+            pip_upgrade_code = self._run_and_report(pip_upgrade_cmd)[0]
+            if pip_upgrade_code != 0:
+                _info("Failed to upgrade pip. Continuing anyway.")
+
         _info(
             "Upgrading all published packages with "
             "--upgrade --force-reinstall --no-cache-dir..."
         )
 
-        results = [self._refresh_package(pkg, use_user=use_user) for pkg in normalized]
+        results = self._refresh_packages(normalized, use_user=use_user)
         return self._summarize(results)
 
     """
@@ -142,6 +256,10 @@ class PipUpdatesRunner:
         self.user = user
         self._ctx = ctx
         self.dry_run = self._ctx_flag(self._ctx, "dry_run")
+        self._outdated_cache: tuple[float, frozenset[str]] | None = None
+        self._index_configured: bool | None = None
+        # Latest PyPI releases seen by this runner, keyed by normalised name.
+        self._latest_versions: dict[str, str] = {}
 
         if self._ctx_flag(self._ctx, "verbose"):
             _info(f"[pip_updates] initialized user={self.user}")
@@ -184,56 +302,116 @@ class PipUpdatesRunner:
             _error(f"Failed to query version for {dist_name}: {exc}")
             return None
 
-    def is_outdated(self, dist_name: str) -> bool:
+    @classmethod
+    def _installed_versions(cls, dist_names: Iterable[str]) -> dict[str, str | None]:
+        """Return installed versions for ``dist_names``, one lookup per name.
+
+        A per-name version() call stops at the first matching distribution,
+        which is far cheaper than walking every installed distribution.
+        """
+        return {name: cls.get_installed_version(name) for name in dist_names}
+
+    def _fetch_outdated_names(self) -> frozenset[str] | None:
         cmd = [
-            sys.executable,
-            "-m",
-            "pip",
+            *PIP_COMMAND,
             "list",
             "--outdated",
             "--format=json",
-            "--disable-pip-version-check",
         ]
         code, out, err = self._run(cmd)
         if code != 0:
             _error(f"pip list failed ({code}): {err.strip()}")
-            return False
+            return None
         try:
-            decoded: object = json.loads(out or "[]")
+            decoded: object = _json_loads(out or "[]")
         except json.JSONDecodeError:
-            return False
+            return None
 
         if not isinstance(decoded, list):
-            return False
+            return None
 
         decoded_list = cast("list[object]", decoded)
+        names: set[str] = set()
         for entry_obj in decoded_list:
             if not isinstance(entry_obj, dict):
                 continue
             entry_mapping = cast("dict[object, object]", entry_obj)
-            entry: dict[str, object] = {
-                key_obj: value_obj
-                for key_obj, value_obj in entry_mapping.items()
-                if isinstance(key_obj, str)
-            }
-            name_obj = entry.get("name")
-            if isinstance(name_obj, str) and name_obj.lower() == dist_name.lower():
-                return True
-        return False
+            name_obj = entry_mapping.get("name")
+            if isinstance(name_obj, str):
+                names.add(name_obj.lower())
+        return frozenset(names)
+
+    def _outdated_names(self) -> frozenset[str]:
+        """Return the ``pip list --outdated`` names, reusing them for a short TTL.
+
+        Failed probes are not cached so the next call retries pip.
+        """
+        now = time.monotonic()
+        cached = self._outdated_cache
+        if cached is not None and now - cached[0] < _OUTDATED_CACHE_TTL_SECONDS:
+            return cached[1]
+        fetched = self._fetch_outdated_names()
+        if fetched is None:
+            return frozenset()
+        self._outdated_cache = (now, fetched)
+        return fetched
+
+    def _custom_index_configured(self) -> bool:
+        """Return True when pip may resolve against something other than PyPI.
+
+        Environment overrides are checked on every call; pip.conf/pip.ini are
+        read once per runner through ``pip config list``.
+        """
+        if any(os.environ.get(var) for var in _INDEX_OVERRIDE_ENV):
+            return True
+        if self._index_configured is None:
+            code, out, _ = self._run([*PIP_COMMAND, "config", "list"])
+            # An unreadable configuration counts as custom so pip list decides.
+            self._index_configured = code != 0 or any(
+                line.split("=", 1)[0].rpartition(".")[2] in _INDEX_CONFIG_KEYS
+                for line in out.splitlines()
+            )
+        return self._index_configured
+
+    def _latest_version(self, dist_name: str) -> str | None:
+        """Return PyPI's latest release, caching answers for this runner.
+
+        Failed lookups are not cached, so a later call asks PyPI again.
+        """
+        key = _normalize_dist_name(dist_name)
+        cached = self._latest_versions.get(key)
+        if cached is not None:
+            return cached
+        latest = _latest_pypi_version(dist_name)
+        if latest is not None:
+            self._latest_versions[key] = latest
+        return latest
+
+    def _pypi_is_newer(self, dist_name: str) -> bool | None:
+        if _packaging_version is None or self._custom_index_configured():
+            return None
+        latest = self._latest_version(dist_name)
+        installed = self.get_installed_version(dist_name)
+        if latest is None or installed is None:
+            return None
+        return _is_newer(latest, installed)
+
+    def is_outdated(self, dist_name: str) -> bool:
+        # PyPI's latest release may still be uninstallable here (yanked, or
+        # excluded by Requires-Python), so its answer only settles "not
+        # newer"; pip list decides whenever an upgrade might exist.
+        if self._pypi_is_newer(dist_name) is False:
+            return False
+        return dist_name.lower() in self._outdated_names()
 
     def pip_install(self, dist_name: str, *, upgrade: bool = False) -> int:
-        cmd = [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "--disable-pip-version-check",
-        ]
+        cmd = [*PIP_COMMAND, "install"]
         if upgrade:
             cmd.append("--upgrade")
         if self.user:
             cmd.append("--user")
         cmd.append(dist_name)
+        self._outdated_cache = None
         return self._run_and_report(cmd)[0]
 
     def ensure(self, dist_name: str) -> None:
@@ -253,20 +431,28 @@ class PipUpdatesRunner:
         else:
             _info(f"{dist_name} is up to date.")
 
-    def _refresh_package(self, package: str, *, use_user: bool) -> InstallResult:
-        previous = self.get_installed_version(package)
+    def _refresh_packages(
+        self, packages: Sequence[str], *, use_user: bool
+    ) -> list[InstallResult]:
+        # One pip invocation resolves the whole batch, so the exit code applies
+        # uniformly to every requested package. Specs such as ``pkg==1.0`` go
+        # to pip as given; versions are looked up by their bare names.
+        names = [_requirement_name(pkg) for pkg in packages]
+        previous = self._installed_versions(names)
         self.user = use_user
-        cmd = self._build_refresh_command(package=package, use_user=use_user)
+        cmd = self._build_refresh_command(packages=packages, use_user=use_user)
+        self._outdated_cache = None
         code = self._run_and_report(cmd)[0]
-        current = self.get_installed_version(package)
-        return InstallResult(package, previous, current, code)
+        current = self._installed_versions(names)
+        return [
+            InstallResult(pkg, previous[name], current[name], code)
+            for pkg, name in zip(packages, names, strict=True)
+        ]
 
     @staticmethod
-    def _build_refresh_command(*, package: str, use_user: bool) -> list[str]:
+    def _build_refresh_command(*, packages: Sequence[str], use_user: bool) -> list[str]:
         cmd = [
-            sys.executable,
-            "-m",
-            "pip",
+            *PIP_COMMAND,
             "install",
             "--upgrade",
             "--force-reinstall",
@@ -274,7 +460,7 @@ class PipUpdatesRunner:
         ]
         if use_user:
             cmd.append("--user")
-        cmd.append(package)
+        cmd.extend(packages)
         return cmd
 
     def _summarize(self, results: Iterable[InstallResult]) -> int: